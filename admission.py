@@ -0,0 +1,282 @@
+"""Admission control: per-client rate limits and per-upstream concurrency limits.
+
+Clients get a token bucket each (RateLimited -> 429). Each upstream gets a
+global cap on concurrent calls; callers over the cap wait in a bounded queue
+and are shed (UpstreamBusy -> 503) when it is full or they time out. An
+upstream can also get a global request rate, e.g. to stay within an API
+quota.
+
+State lives in a store so limits hold across worker processes: RedisStore
+for a shared Redis, or LocalStore, an in-process stand-in with the same
+semantics (limits then apply per worker). Store errors are logged and the
+request is admitted, so a store outage never fails requests.
+"""
+import logging
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import requests
+
+
+class AdmissionRejected(Exception):
+    """Request refused to protect the server; status and retry_after shape the HTTP answer."""
+
+    status = 503
+
+    def __init__(self, message, retry_after=1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionRejected):
+    status = 429
+
+
+class UpstreamBusy(AdmissionRejected, requests.RequestException):
+    """An upstream's concurrency queue is full, the wait timed out or its rate limit is spent."""
+
+
+class AdmissionStore(ABC):
+    """Interface for admission state shared between worker processes."""
+
+    @abstractmethod
+    def take_tokens(self, key, rate, burst, cost=1):
+        """Take cost tokens from the bucket at key. Returns seconds to wait before retrying, 0 if taken."""
+
+    @abstractmethod
+    def acquire_slot(self, key, limit, lease):
+        """Take one of limit slots at key for at most lease seconds. Returns a slot token, or None if all are taken."""
+
+    @abstractmethod
+    def release_slot(self, key, token):
+        """Give back a slot taken with acquire_slot."""
+
+
+class LocalStore(AdmissionStore):
+    """In-process stand-in for a shared store.
+
+    A missing bucket is a full one, so buckets that have refilled are swept
+    away every sweep_interval seconds and memory stays bounded by the
+    clients seen recently rather than all clients ever seen.
+    """
+
+    def __init__(self, sweep_interval=10.0):
+        self._lock = threading.Lock()
+        self._buckets = {}  # key -> (tokens, updated_at, full_at)
+        self._slots = {}  # key -> {token: expires_at}
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def take_tokens(self, key, rate, burst, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            tokens, updated_at, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            return wait
+
+    def _sweep(self, now):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        self._next_sweep = now + self.sweep_interval
+
+    def acquire_slot(self, key, limit, lease):
+        now = time.monotonic()
+        with self._lock:
+            slots = self._slots.setdefault(key, {})
+            for token in [t for t, expires_at in slots.items() if expires_at <= now]:
+                del slots[token]  # Holder died or hung past its lease
+            if len(slots) >= limit:
+                return None
+            token = uuid.uuid4().hex
+            slots[token] = now + lease
+            return token
+
+    def release_slot(self, key, token):
+        with self._lock:
+            self._slots.get(key, {}).pop(token, None)
+
+
+# Both scripts use the server clock so every worker sees the same time
+_TAKE_TOKENS = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+_ACQUIRE_SLOT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then return 0 end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2])) + 1)
+return 1
+"""
+
+
+class RedisStore(AdmissionStore):
+    def __init__(self, url, prefix="admission"):
+        import redis  # Optional dependency, only needed for limits shared across workers
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._prefix = prefix
+        self._take_tokens = self._client.register_script(_TAKE_TOKENS)
+        self._acquire_slot = self._client.register_script(_ACQUIRE_SLOT)
+
+    def take_tokens(self, key, rate, burst, cost=1):
+        return float(self._take_tokens(keys=[f"{self._prefix}:bucket:{key}"], args=[rate, burst, cost]))
+
+    def acquire_slot(self, key, limit, lease):
+        token = uuid.uuid4().hex
+        if self._acquire_slot(keys=[f"{self._prefix}:slots:{key}"], args=[limit, lease, token]):
+            return token
+        return None
+
+    def release_slot(self, key, token):
+        self._client.zrem(f"{self._prefix}:slots:{key}", token)
+
+
+def make_store(url):
+    """Build a store from a URL; no URL means a LocalStore (limits per worker)."""
+    if not url or url == "local://":
+        return LocalStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported admission store URL: {url}")
+
+
+class ClientRateLimiter:
+    """Token bucket per client: `rate` requests per second on average, bursts of up to `burst`."""
+
+    def __init__(self, store, rate, burst):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.limited = 0
+        self.store_errors = 0
+
+    def check(self, client, cost=1):
+        """Raise RateLimited if client is over its rate; a no-op when rate is 0."""
+        if self.rate <= 0 or cost <= 0:
+            return
+        try:
+            # A cost above the burst could never be paid, so the most it can take is a full bucket
+            wait = self.store.take_tokens(f"client:{client}", self.rate, self.burst, min(cost, self.burst))
+        except Exception as e:
+            self.store_errors += 1
+            logging.warning("Admission store error, admitting request: %s", e)
+            return
+        if wait > 0:
+            self.limited += 1
+            raise RateLimited("Too many requests, please slow down.", retry_after=wait)
+
+
+class UpstreamLimiter:
+    """Global cap on concurrent calls to one upstream, with a bounded per-worker wait queue.
+
+    Hold slot() around the whole call, retries included. Waiters poll the store with
+    jittered sleeps so the same code works for local and shared stores.
+    """
+
+    def __init__(self, store, name, max_concurrency, max_waiting=64, queue_timeout=1.0, lease=30.0,
+                 rate=0.0, burst=1.0):
+        self.store = store
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self.lease = lease
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.shed = 0
+        self.store_errors = 0
+
+    @contextmanager
+    def slot(self):
+        """Wait for a free slot (raising UpstreamBusy if that isn't possible) and hold it for the block."""
+        token = self._acquire()
+        try:
+            yield
+        finally:
+            if token is not None:
+                try:
+                    self.store.release_slot(f"upstream:{self.name}", token)
+                except Exception as e:
+                    self.store_errors += 1
+                    logging.warning("Admission store error releasing %s slot: %s", self.name, e)
+
+    def _acquire(self):
+        if self.rate > 0:
+            self._take_rate_token()
+        if self.max_concurrency <= 0:
+            return None
+        token = self._try_acquire()
+        if token is not False:
+            return token
+        with self._lock:
+            if self.waiting >= self.max_waiting:
+                self.shed += 1
+                raise UpstreamBusy(f"{self.name} upstream is saturated, please retry shortly.")
+            self.waiting += 1
+        try:
+            deadline = time.monotonic() + self.queue_timeout
+            delay = 0.002
+            while time.monotonic() < deadline:
+                time.sleep(random.uniform(delay / 2, delay))
+                delay = min(delay * 2, 0.05)
+                token = self._try_acquire()
+                if token is not False:
+                    return token
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.shed += 1
+        raise UpstreamBusy(f"{self.name} upstream is saturated, please retry shortly.")
+
+    def _try_acquire(self):
+        """A slot token, None if the store failed (admit anyway), or False if all slots are taken."""
+        try:
+            token = self.store.acquire_slot(f"upstream:{self.name}", self.max_concurrency, self.lease)
+        except Exception as e:
+            self.store_errors += 1
+            logging.warning("Admission store error, admitting %s call: %s", self.name, e)
+            return None
+        return False if token is None else token
+
+    def _take_rate_token(self):
+        try:
+            wait = self.store.take_tokens(f"upstream:{self.name}", self.rate, self.burst)
+        except Exception as e:
+            self.store_errors += 1
+            logging.warning("Admission store error, admitting %s call: %s", self.name, e)
+            return
+        if wait > 0:
+            with self._lock:
+                self.shed += 1
+            raise UpstreamBusy(f"{self.name} request rate limit reached, please retry shortly.", retry_after=wait)
+
+    def stats(self):
+        return {"max_concurrency": self.max_concurrency, "waiting": self.waiting, "shed": self.shed,
+                "store_errors": self.store_errors}
@@ -1,14 +1,41 @@
-from flask import Flask, render_template_string, request, jsonify
-import requests
+from flask import Flask, Response, abort, g, request, jsonify, stream_with_context
+import hashlib
+import json
+import functools
+import math
+import time
+import contextvars
 import re
+import os
 import logging
-from spellchecker import SpellChecker  # For spell correction
-
-# Enable debug logging to terminal
-logging.basicConfig(level=logging.DEBUG)
-
-# Initialize spell checker globally (loads once)
-spell = SpellChecker()
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+from cache import LRUCache, TieredCache, make_backend
+from local_dictionary import LocalDictionary, extract_definitions
+from recipe_store import Recipe, RecipeStore, normalize_query
+from upstream import CircuitBreaker, UpstreamClient
+from admission import AdmissionRejected, ClientRateLimiter, UpstreamBusy, UpstreamLimiter, make_store
+from spelling import SymSpell
+from suggest import PrefixIndex
+from classifier import FOOD, FORMULA, QueryClassifier
+from assets import IMMUTABLE_CACHE_CONTROL, AssetManifest, minify_html
+from compression import choose_encoding, compress_response, precompress, set_encoded_body, strip_etag_suffixes
+from singleflight import SingleFlight
+from metrics import Registry, finish_trace, span, start_trace
+from logging_config import configure_logging, dropped_records
+
+# Queue-backed logging, level and format from LOG_LEVEL / LOG_FORMAT (see logging_config.py)
+configure_logging()
+
+def spellchecker_frequencies():
+    # Imported and decompressed only when there is no spell index snapshot to map
+    from spellchecker import SpellChecker
+    return SpellChecker().word_frequency.dictionary
+
+# Symmetric-delete correction index over SpellChecker's word frequencies (see spelling.py)
+spell_index = SymSpell.load_or_build(os.environ.get("SPELL_INDEX_PATH", "data/spell_index.bin"), spellchecker_frequencies)
 
 app = Flask(__name__)
 
@@ -21,142 +48,7 @@ HTML_TEMPLATE = """
     <title>AI Quick Context Finder</title>
     <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
     <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
-    <style>
-        * { box-sizing: border-box; }
-        body {
-            font-family: Arial, sans-serif;
-            background: #f8f9fa;
-            margin: 0;
-            padding: 10px;
-            min-height: 100vh;
-            color: #333;
-        }
-        .container {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-            max-width: 600px;
-            margin: 0 auto;
-            text-align: center;
-        }
-        .search-form {
-            position: relative;
-            margin-bottom: 20px;
-        }
-        input[type="text"] {
-            padding: 12px;
-            width: 100%;
-            max-width: 400px;
-            border: 2px solid #ddd;
-            border-radius: 6px;
-            font-size: 16px;
-        }
-        input:focus {
-            border-color: #007bff;
-            outline: none;
-        }
-        button {
-            padding: 12px 20px;
-            border: none;
-            border-radius: 6px;
-            background: #007bff;
-            color: white;
-            cursor: pointer;
-            font-size: 16px;
-            margin-left: 10px;
-        }
-        button:hover:not(:disabled) {
-            background: #0056b3;
-        }
-        button:disabled {
-            background: #ccc;
-            cursor: not-allowed;
-        }
-        .loading {
-            display: none;
-            margin: 20px 0;
-            color: #007bff;
-            font-style: italic;
-        }
-        .result {
-            margin-top: 20px;
-            text-align: left;
-            padding: 15px;
-            background: #f8f9fa;
-            border-radius: 8px;
-            border-left: 4px solid #007bff;
-        }
-        .error {
-            color: #dc3545;
-            background: #f8d7da;
-            border-left-color: #dc3545;
-        }
-        .formula-result {
-            text-align: center;
-        }
-        .formula-render {
-            font-size: 20px;
-            margin: 15px 0;
-            padding: 10px;
-            background: #fff;
-            border-radius: 6px;
-        }
-        .correction-note {
-            background: #d4edda;
-            padding: 8px;
-            border-radius: 4px;
-            color: #155724;
-            margin-bottom: 10px;
-            font-style: italic;
-        }
-        h1 {
-            margin-bottom: 20px;
-            color: #333;
-        }
-        h3 {
-            color: #007bff;
-            margin-top: 0;
-        }
-        ul, ol {
-            padding-left: 20px;
-        }
-        li {
-            margin-bottom: 5px;
-        }
-        .history {
-            margin-top: 20px;
-            text-align: left;
-            font-size: 14px;
-            color: #666;
-        }
-        .suggestions {
-            position: absolute;
-            top: 100%;
-            left: 0;
-            right: 0;
-            background: white;
-            border: 1px solid #ddd;
-            border-radius: 6px;
-            max-height: 150px;
-            overflow-y: auto;
-            z-index: 1000;
-            display: none;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }
-        .suggestion-item {
-            padding: 10px;
-            cursor: pointer;
-        }
-        .suggestion-item:hover {
-            background: #f8f9fa;
-        }
-        @media (max-width: 600px) {
-            .container { padding: 15px; }
-            input[type="text"] { max-width: none; margin-bottom: 10px; }
-            button { width: 100%; margin-left: 0; margin-top: 10px; }
-        }
-    </style>
+    <link rel="stylesheet" href="{{ asset_url('app.css') }}">
 </head>
 <body>
     <div class="container">
@@ -213,319 +105,731 @@ HTML_TEMPLATE = """
         </div>
     </div>
 
-    <script>
-        // Fallback for no JS: Form works normally
-        let searchHistory = JSON.parse(localStorage.getItem('searchHistory')) || [];
-        const suggestionsData = ['apple', 'pasta', 'chicken', 'love', 'run', 'pythagoras', 'quadratic'];
-
-        function showSuggestions(input) {
-            const inputVal = input.toLowerCase();
-            const suggestionsDiv = document.getElementById('suggestions');
-            suggestionsDiv.innerHTML = '';
-            if (inputVal.length < 2) {
-                suggestionsDiv.style.display = 'none';
-                return;
-            }
-            const filtered = suggestionsData.filter(word => word.startsWith(inputVal));
-            if (filtered.length > 0) {
-                filtered.forEach(word => {
-                    const item = document.createElement('div');
-                    item.className = 'suggestion-item';
-                    item.textContent = word;
-                    item.onclick = () => {
-                        document.getElementById('searchInput').value = word;
-                        suggestionsDiv.style.display = 'none';
-                        document.getElementById('searchForm').submit();
-                    };
-                    suggestionsDiv.appendChild(item);
-                });
-                suggestionsDiv.style.display = 'block';
-            } else {
-                suggestionsDiv.style.display = 'none';
-            }
-        }
-
-        const searchInput = document.getElementById('searchInput');
-        searchInput.addEventListener('input', (e) => showSuggestions(e.target.value));
-        searchInput.addEventListener('focus', () => showSuggestions(searchInput.value));
-
-        document.addEventListener('click', (e) => {
-            if (!e.target.closest('.search-form')) {
-                document.getElementById('suggestions').style.display = 'none';
-            }
-        });
-
-        function addToHistory(query) {
-            if (!searchHistory.includes(query)) {
-                searchHistory.unshift(query);
-                if (searchHistory.length > 5) searchHistory.pop();
-                localStorage.setItem('searchHistory', JSON.stringify(searchHistory));
-                updateHistory();
-            }
-        }
-
-        function updateHistory() {
-            const historyDiv = document.getElementById('history');
-            const historyList = document.getElementById('historyList');
-            historyList.innerHTML = '';
-            if (searchHistory.length > 0) {
-                historyDiv.style.display = 'block';
-                searchHistory.forEach(item => {
-                    const li = document.createElement('li');
-                    li.textContent = item;
-                    li.style.cursor = 'pointer';
-                    li.style.color = '#007bff';
-                    li.onclick = () => {
-                        searchInput.value = item;
-                        document.getElementById('searchForm').submit();
-                    };
-                    historyList.appendChild(li);
-                });
-            }
-        }
-
-        // Intercept form for AJAX (if JS enabled)
-        document.getElementById('searchForm').addEventListener('submit', async (e) => {
-            e.preventDefault();
-            const query = searchInput.value.trim();
-            if (!query) return;
-
-            addToHistory(query);
-            const loading = document.getElementById('loading');
-            let result = document.getElementById('result');
-            if (!result) {
-                result = createResultDiv();
-            }
-            const btn = document.getElementById('searchBtn');
-            loading.style.display = 'block';
-            result.innerHTML = '';
-            btn.disabled = true;
-
-            try {
-                const formData = new FormData();
-                formData.append('word', query);
-                const response = await fetch('/', {
-                    method: 'POST',
-                    body: formData
-                });
-                const data = await response.json();
-
-                let resultHtml = '';
-                let isError = false;
-                if (data.correction_message) {
-                    resultHtml += `<div class="correction-note">${data.correction_message}</div>`;
-                }
-                if (data.formula_detected) {
-                    resultHtml += `
-                        <div class="formula-result">
-                            <h3>Formula: ${data.original_word || query}</h3>
-                            <div class="formula-render">$${data.formula_latex || query}$$</div>
-                            <p><strong>Explanation:</strong> Mathematical expression rendered precisely.</p>
-                        </div>
-                    `;
-                } else if (data.recipe) {
-                    resultHtml += `
-                        <h3>Recipe: ${data.recipe.title}</h3>
-                        ${data.recipe.ingredients ? `<strong>Ingredients:</strong><ul>${data.recipe.ingredients.map(ing => `<li>${ing}</li>`).join('')}</ul>` : ''}
-                        <strong>Instructions:</strong><p>${data.recipe.instructions.replace(/\n/g, '<br>')}</p>
-                    `;
-                } else if (data.definitions && data.definitions.length > 0) {
-                    const displayWord = data.corrected_word || data.original_word || query;
-                    resultHtml += `<strong>${displayWord}:</strong><ol>${data.definitions.map(d => `<li>${d}</li>`).join('')}</ol>`;
-                } else if (data.error) {
-                    resultHtml += `<strong>Error:</strong> ${data.error}`;
-                    isError = true;
-                } else {
-                    resultHtml += 'No results found. Try a different query!';
-                }
-
-                result.innerHTML = resultHtml;
-                result.className = isError ? 'result error' : 'result';
-            } catch (err) {
-                result.innerHTML = '<strong>Error:</strong> Connection issue. Please refresh and try again.';
-                result.className = 'result error';
-                console.error('Search error:', err);
-            } finally {
-                loading.style.display = 'none';
-                btn.disabled = false;
-                document.getElementById('suggestions').style.display = 'none';
-            }
-        });
-
-        function createResultDiv() {
-            const div = document.createElement('div');
-            div.id = 'result';
-            div.className = 'result';
-            document.querySelector('.container').insertBefore(div, document.getElementById('history') || null);
-            return div;
-        }
-
-        // Init history
-        updateHistory();
-    </script>
+    <script src="{{ asset_url('app.js') }}"></script>
 </body>
 </html>
 """
 
-# --------- Spoonacular API for recipes ---------
-SPOONACULAR_API_KEY = "YOUR_API_KEY_HERE"  # MUST REPLACE WITH REAL KEY FOR RECIPES!
-
+# --------- Metrics ---------
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram("aidict_http_request_duration_seconds", "Time to produce a response, by endpoint and HTTP status.", ["endpoint", "method", "status"])
+STAGE_SECONDS = metrics.histogram("aidict_stage_duration_seconds", "Time spent in each stage of a lookup.", ["stage"])
+UPSTREAM_SECONDS = metrics.histogram("aidict_upstream_request_duration_seconds", "Upstream HTTP attempts, by upstream and status code.", ["upstream", "status"])
+# Fraction of requests whose per-stage timings are logged (0 disables tracing)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", 0))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    g.trace_token = start_trace(TRACE_SAMPLE_RATE)
+
+@app.after_request
+def record_request_time(response):
+    finish = functools.partial(_finish_request, g.request_start, g.trace_token, request.endpoint or "unknown",
+                               request.method, request.path, str(response.status_code))
+    if response.is_streamed:
+        response.call_on_close(finish)  # The body is generated after this hook: time it until the stream closes
+    else:
+        finish()
+    return response
+
+def _finish_request(start, trace_token, endpoint, method, path, status):
+    elapsed = time.perf_counter() - start
+    REQUEST_SECONDS.observe(elapsed, endpoint, method, status)
+    if trace_token is not None:
+        finish_trace(trace_token, f"{method} {path} {status} total={elapsed * 1000:.2f}ms")
+
+# --------- Compression ---------
+# gzip (or brotli, with the brotli package) for compressible bodies at least this big
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 512))
+
+@app.before_request
+def accept_compressed_etags():
+    g.etag_encoding = strip_etag_suffixes(request.environ)
+
+@app.after_request
+def compress(response):
+    return compress_response(response, request.headers.get("Accept-Encoding"), COMPRESS_MIN_SIZE, g.get("etag_encoding"))
+
+# --------- Page Rendering ---------
+# CSS/JS are served from content-hashed URLs so they can be cached indefinitely
+assets = AssetManifest(app.static_folder, ["app.css", "app.js"])
+app.jinja_env.globals["asset_url"] = lambda name: f"/assets/{assets.hashed_name(name)}"
+
+# Minified and compiled once instead of on every render_template_string call
+page_template = app.jinja_env.from_string(minify_html(HTML_TEMPLATE))
+
+def render_page(**context):
+    with span(STAGE_SECONDS, "render"):
+        return page_template.render(**context)
+
+# The empty search page never changes between deploys, so render and tag it once
+EMPTY_PAGE = render_page()
+EMPTY_PAGE_ETAG = hashlib.sha256(EMPTY_PAGE.encode("utf-8")).hexdigest()[:16]
+EMPTY_PAGE_BODIES = precompress(EMPTY_PAGE.encode("utf-8"))
+
+# --------- Admission Control ---------
+# Limits are shared by all workers through ADMISSION_URL (redis://); without it each worker keeps its own
+admission_store = make_store(os.environ.get("ADMISSION_URL"))
+# Off by default: behind a proxy every client shares its address until TRUST_FORWARDED_FOR is set
+client_limiter = ClientRateLimiter(admission_store, rate=float(os.environ.get("RATE_LIMIT_RATE", 0)),
+                                   burst=float(os.environ.get("RATE_LIMIT_BURST", 40)))
+RATE_LIMITED_ENDPOINTS = {"home_post", "batch", "lookup"}
+# Number of proxies in front of the app that append to X-Forwarded-For (e.g. 1 for the Heroku router).
+# Each one appends the address it saw, so only that many entries from the right can be trusted;
+# anything further left was sent by the client and could be made up.
+TRUST_FORWARDED_FOR = int(os.environ.get("TRUST_FORWARDED_FOR") or 0)
+
+def client_id():
+    if TRUST_FORWARDED_FOR > 0:
+        forwarded = [a.strip() for a in request.headers.get("X-Forwarded-For", "").split(",") if a.strip()]
+        if len(forwarded) >= TRUST_FORWARDED_FOR:
+            return forwarded[-TRUST_FORWARDED_FOR]
+    return request.remote_addr or "unknown"
+
+@app.before_request
+def admit_client():
+    if request.endpoint in RATE_LIMITED_ENDPOINTS:
+        client_limiter.check(client_id())
+
+@app.errorhandler(AdmissionRejected)
+def reject_request(e):
+    """Fast 429 (client over its rate) or 503 (upstream saturated) with a Retry-After hint."""
+    if request.method == "POST" and request.endpoint == "home_post" and request.headers.get("Accept") not in ("application/json", "application/x-ndjson"):
+        response = app.make_response(render_page(word=request.form.get("word", "").strip(), error=str(e)))
+    else:
+        response = jsonify({"error": str(e)})
+    response.status_code = e.status
+    response.headers["Retry-After"] = str(max(1, math.ceil(e.retry_after)))
+    return response
+
+# --------- Upstream HTTP clients ---------
+def make_upstream_client(name, default_url):
+    """Pooled keep-alive client for one upstream; settings come from <NAME>_* env vars."""
+    prefix = name.upper()
+
+    def env(key, default):
+        return os.environ.get(f"{prefix}_{key}", os.environ.get(f"UPSTREAM_{key}", default))
+
+    connect_timeout = float(env("CONNECT_TIMEOUT", 1.0))
+    read_timeout = float(env("READ_TIMEOUT", 3.0))
+    retries = int(env("RETRIES", 1))
+    return UpstreamClient(
+        name,
+        os.environ.get(f"{prefix}_API_URL", default_url),
+        pool_size=int(env("POOL_SIZE", 10)),
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries=retries,
+        breaker=CircuitBreaker(
+            failure_threshold=int(env("BREAKER_THRESHOLD", 5)),
+            reset_timeout=float(env("BREAKER_RESET", 30)),
+        ),
+        observer=lambda upstream, status, seconds: UPSTREAM_SECONDS.observe(seconds, upstream, status),
+        limiter=UpstreamLimiter(
+            admission_store, name,
+            max_concurrency=int(env("MAX_CONCURRENCY", 32)),
+            max_waiting=int(env("MAX_WAITING", 64)),
+            queue_timeout=float(env("QUEUE_TIMEOUT", 1.0)),
+            # A slot outlives the longest possible call (all attempts timing out) only if its holder died
+            lease=(connect_timeout + read_timeout + 1) * (retries + 1),
+            rate=float(env("RATE_LIMIT", 0)),
+            burst=float(env("RATE_BURST", 10)),
+        ),
+    )
+
+recipe_client = make_upstream_client("spoonacular", "https://api.spoonacular.com")
+dictionary_client = make_upstream_client("dictionary", "https://api.dictionaryapi.dev")
+
+# --------- Query Classification ---------
+FORMULA_KEYWORDS = {'formula', 'equation', 'pythagoras', 'quadratic', 'integral'}
 FOOD_KEYWORDS = {'soup', 'salad', 'cake', 'pasta', 'chicken', 'pizza', 'burger', 'sushi', 'taco', 'curry', 'apple', 'banana'}
 
+# Keyword sets can be replaced from a JSON file ({"formula": [...], "food": [...]}), see classifier.py
+if os.environ.get("QUERY_KEYWORDS_PATH"):
+    query_classifier = QueryClassifier.from_file(os.environ["QUERY_KEYWORDS_PATH"], FORMULA_KEYWORDS, FOOD_KEYWORDS)
+else:
+    query_classifier = QueryClassifier(FORMULA_KEYWORDS, FOOD_KEYWORDS)
+
+# --------- Spoonacular API for recipes ---------
+SPOONACULAR_API_KEY = os.environ.get("SPOONACULAR_API_KEY", "YOUR_API_KEY_HERE")  # MUST SET A REAL KEY FOR RECIPES!
+
 def is_food_related(word):
-    word_lower = word.lower()
-    return word_lower in FOOD_KEYWORDS or any(kw in word_lower for kw in FOOD_KEYWORDS)
+    return query_classifier.is_food(word)
+
+# Trimmed recipes persisted per normalized query so repeat food queries never spend API quota
+recipe_store = RecipeStore.open(os.environ.get("RECIPE_STORE_PATH", "data/recipes.db"),
+                                negative_ttl=int(os.environ.get("RECIPE_NEGATIVE_TTL", 7 * 24 * 3600)))
+_NOT_STORED = object()
+
+# Concurrent lookups of the same normalized query share one upstream call
+recipe_flight = SingleFlight()
+
+def recipes_enabled():
+    return bool(SPOONACULAR_API_KEY) and SPOONACULAR_API_KEY != "YOUR_API_KEY_HERE"
 
 def get_food_recipe(word):
-    if not SPOONACULAR_API_KEY or SPOONACULAR_API_KEY == "YOUR_API_KEY_HERE":
+    if not recipes_enabled():
         return {"error": "Recipe feature requires a valid Spoonacular API key. Definitions and formulas still work!"}
     if not is_food_related(word):
         return None
+    key = normalize_query(word)
+    recipe = recipe_store.get(key, _NOT_STORED) if recipe_store else _NOT_STORED
+    if recipe is _NOT_STORED:
+        recipe = recipe_flight.do(key, _fetch_and_store_recipe, key)
+    return recipe.as_dict() if isinstance(recipe, Recipe) else recipe
+
+def _fetch_and_store_recipe(key):
+    recipe = fetch_food_recipe(key)
+    if recipe_store is not None and not isinstance(recipe, dict):  # Errors are never stored
+        recipe_store.put(key, recipe)
+    return recipe
+
+def fetch_food_recipe(word):
+    """Fetch the top Spoonacular result for word: a Recipe, None if there is none, or an error dict."""
     try:
-        url = f"https://api.spoonacular.com/recipes/complexSearch?query={word}&number=1&addRecipeInformation=true&apiKey={SPOONACULAR_API_KEY}"
-        response = requests.get(url, timeout=10)
-        logging.debug(f"Recipe API response status: {response.status_code}")
+        params = {"query": word, "number": 1, "addRecipeInformation": "true", "apiKey": SPOONACULAR_API_KEY}
+        response = recipe_client.get("/recipes/complexSearch", params=params)
+        logging.debug("Recipe API response status: %s", response.status_code)
         if response.status_code == 401:
-            return {"error": "Invalid Spoonacular API key. Please update it in the code."}
+            return {"error": "Invalid Spoonacular API key. Please update SPOONACULAR_API_KEY."}
         if response.status_code != 200:
             return {"error": f"Recipe search failed (status: {response.status_code})."}
         data = response.json()
         if data.get("results"):
-            recipe = data["results"][0]
-            ingredients = [i.get("original", "").strip() for i in recipe.get("extendedIngredients", []) if i.get("original")]
-            instructions = recipe.get("instructions", "No instructions available.").replace('\n', ' ')
-            return {
-                "title": recipe.get("title", f"{word.title()} Recipe"),
-                "ingredients": ingredients[:10],  # Limit for brevity
-                "instructions": instructions
-            }
+            return Recipe.from_result(data["results"][0], word)
         return None
     except Exception as e:
-        logging.error(f"Recipe error: {e}")
+        logging.error("Recipe error: %s", e)
         return {"error": f"Recipe search unavailable: {str(e)}"}
 
+@app.cli.command("prewarm-recipes")
+def prewarm_recipes():
+    """Fetch and store a recipe for every food keyword not already in the recipe store."""
+    if recipe_store is None:
+        raise SystemExit("Recipe store is disabled (RECIPE_STORE_PATH is empty).")
+    if not recipes_enabled():
+        raise SystemExit("Set SPOONACULAR_API_KEY to prewarm recipes.")
+    fetched = failed = 0
+    for keyword in sorted(query_classifier.food_keywords):
+        if keyword in recipe_store:
+            continue
+        recipe = _fetch_and_store_recipe(keyword)
+        if isinstance(recipe, dict):
+            failed += 1
+            print(f"{keyword}: {recipe['error']}")
+        else:
+            fetched += 1
+    print(f"Stored {fetched} recipes ({failed} failed); {len(query_classifier.food_keywords) - fetched - failed} already stored.")
+
 # --------- Dictionary API ---------
-def get_definitions(word):
+WORD_NOT_FOUND = "Word not found in dictionary."
+DEFINITION_UNAVAILABLE = "Unable to fetch definition at this time."
+
+DEFINITION_CACHE_TTL = int(os.environ.get("DEFINITION_CACHE_TTL", 24 * 3600))
+DEFINITION_NEGATIVE_TTL = int(os.environ.get("DEFINITION_NEGATIVE_TTL", 15 * 60))
+
+# Cache shared across workers (e.g. redis://), or None; used behind each per-worker LRU
+shared_cache = make_backend(os.environ.get("CACHE_URL"))
+
+definition_cache = TieredCache(
+    LRUCache(maxsize=int(os.environ.get("DEFINITION_CACHE_SIZE", 4096)), ttl=DEFINITION_CACHE_TTL),
+    shared=shared_cache,
+    namespace="def",
+)
+
+# Prebuilt offline index for common words (see local_dictionary.py); None if not built
+local_dictionary = LocalDictionary.open(os.environ.get("LOCAL_DICTIONARY_PATH", "data/dictionary.db"))
+
+# Concurrent cache misses for the same word share one upstream call
+definition_flight = SingleFlight()
+
+def fetch_definitions(word):
+    """Query dictionaryapi.dev. Returns (definitions, ttl); ttl is None for results that must not be cached."""
     try:
-        url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-        response = requests.get(url, timeout=10)
-        logging.debug(f"Dictionary API status: {response.status_code}")
+        response = dictionary_client.get(f"/api/v2/entries/en/{quote(word)}")
+        logging.debug("Dictionary API status: %s", response.status_code)
         if response.status_code == 200:
-            data = response.json()
-            definitions = []
-            for meaning in data[0].get("meanings", [])[:2]:
-                pos = meaning.get("partOfSpeech", "n.")
-                for defn in meaning.get("definitions", [])[:2]:
-                    text = defn.get("definition", "").strip()
-                    if text:
-                        definitions.append(f"{pos}: {text}")
-            return definitions if definitions else ["No exact definition found."]
-        return ["Word not found in dictionary."]
+            definitions = extract_definitions(response.json()[0])
+            return (definitions if definitions else ["No exact definition found."]), DEFINITION_CACHE_TTL
+        if response.status_code == 404:
+            return [WORD_NOT_FOUND], DEFINITION_NEGATIVE_TTL
+        return [WORD_NOT_FOUND], None  # Rate limits / server errors are transient
+    except UpstreamBusy:
+        raise  # Shed: answer the whole request with a fast 503 instead of a degraded result
     except Exception as e:
-        logging.error(f"Definition error: {e}")
-        return ["Unable to fetch definition at this time."]
+        logging.error("Definition error: %s", e)
+        return [DEFINITION_UNAVAILABLE], None
+
+def get_definitions(word):
+    """Returns (definitions, transient); transient is True if they stand in for a failed upstream call."""
+    key = word.strip().lower()
+    if local_dictionary is not None:
+        definitions = local_dictionary.lookup(key)
+        if definitions:
+            return definitions, False
+    cached = definition_cache.get(key)
+    if cached is not None:
+        return cached, False
+    return definition_flight.do(key, _fetch_and_cache_definitions, key)
+
+def _fetch_and_cache_definitions(key):
+    definitions, ttl = fetch_definitions(key)
+    if ttl is None:
+        return definitions, True
+    definition_cache.set(key, definitions, ttl=ttl)
+    return definitions, False
 
 # --------- Formula Detection ---------
+LATEX_EXPONENT_RE = re.compile(r'\^(\d+)')
+
+def formula_result(query):
+    # Basic LaTeX escaping (accurate for common cases)
+    latex = LATEX_EXPONENT_RE.sub(r'^{\1}', query)  # e.g., x^2 -> x^{2}
+    latex = latex.replace('**', '')  # Remove any Python-style exponents
+    latex = latex.replace('\\', '\\\\')  # Escape backslashes if any
+    return {"formula_detected": True, "formula_latex": latex}
+
 def detect_formula(query):
-    math_keywords = ['formula', 'equation', 'pythagoras', 'quadratic', 'integral']
-    math_symbols = r'[\+\-\*/=^∫∑√\$\$\{\}\$\$]'
-    if re.search(math_symbols, query) or any(kw in query.lower() for kw in math_keywords):
-        # Basic LaTeX escaping (accurate for common cases)
-        latex = re.sub(r'\^(\d+)', r'^{\1}', query)  # e.g., x^2 -> x^{2}
-        latex = latex.replace('**', '')  # Remove any Python-style exponents
-        latex = re.sub(r'\\', r'\\\\', latex)  # Escape backslashes if any
-        return {"formula_detected": True, "formula_latex": latex}
+    if query_classifier.is_formula(query):
+        return formula_result(query)
     return None
 
-# --------- Routes ---------
-@app.route("/", methods=["GET"])
-def home_get():
-    """Serve the initial HTML template (empty form)."""
-    return render_template_string(HTML_TEMPLATE)
+# --------- Spell Correction ---------
+CORRECTABLE_QUERY_RE = re.compile(r'^[a-zA-Z\s]+$')
+# Corrections are deterministic, so memoized results never expire; only the size is bounded
+correction_memo = LRUCache(maxsize=int(os.environ.get("CORRECTION_MEMO_SIZE", 8192)), ttl=float("inf"))
+correction_counts = Counter()  # known / memoized (both short-circuited) vs computed
+_correction_counts_lock = threading.Lock()
+_NOT_MEMOIZED = object()
+
+def _count_correction(outcome):
+    with _correction_counts_lock:
+        correction_counts[outcome] += 1
+
+def correct_spelling(word):
+    """Spell-correct a normalized (lowercase, stripped) query, skipping known words and reusing memoized results."""
+    if word in spell_index:
+        _count_correction("known")
+        return word
+    corrected = correction_memo.get(word, _NOT_MEMOIZED)
+    if corrected is not _NOT_MEMOIZED:
+        _count_correction("memoized")
+        return corrected
+    corrected = spell_index.correction(word)
+    correction_memo.set(word, corrected)
+    _count_correction("computed")
+    return corrected
+
+def correction_stats():
+    with _correction_counts_lock:
+        stats = {outcome: correction_counts[outcome] for outcome in ("known", "memoized", "computed")}
+    stats["short_circuited"] = stats["known"] + stats["memoized"]
+    stats["memo"] = correction_memo.stats()
+    return stats
+
+# --------- Autocomplete ---------
+SUGGEST_DEFAULT_K = 8
+SUGGEST_MAX_K = 20
+_suggest_index = None
+_suggest_index_lock = threading.Lock()
+
+def get_suggest_index():
+    """Build the prefix index on first use, keeping it off the start-up path."""
+    global _suggest_index
+    if _suggest_index is None:
+        with _suggest_index_lock:
+            if _suggest_index is None:
+                _suggest_index = PrefixIndex(spell_index.words, max_k=SUGGEST_MAX_K)
+    return _suggest_index
+
+# --------- Lookup Pipeline ---------
+# Threads are only started on first submit, so this is safe to create before a pre-fork server forks
+upstream_pool = ThreadPoolExecutor(max_workers=int(os.environ.get("UPSTREAM_WORKERS", 16)), thread_name_prefix="upstream")
+
+def lookup_word(word, food=None):
+    """Look up a word, recipe taking priority over definitions. Returns (recipe, definitions, error, transient).
+
+    For food queries the dictionary call starts alongside the recipe call instead of
+    after it, and is dropped if the recipe wins. Pass `food` if the query was already classified.
+    transient is True if an upstream failure shaped the answer, so it must not be cached.
+    """
+    if food is None:
+        food = is_food_related(word)
+    # Run in a copy of this context so the pooled call still lands in the request's trace
+    definitions_future = upstream_pool.submit(contextvars.copy_context().run, _timed_definitions, word) if food else None
+    recipe = _timed_recipe(word)
+    error = None
+    recipe_failed = False
+    if isinstance(recipe, dict) and "error" in recipe:
+        error = recipe["error"]
+        recipe = None
+        recipe_failed = food and recipes_enabled()  # A missing key is configuration, not a failure
+
+    if recipe:
+        if definitions_future is not None:
+            definitions_future.cancel()  # No-op if already running; its result is simply ignored
+        return recipe, None, error, False
+    if definitions_future is not None:
+        definitions, definitions_failed = definitions_future.result()
+    else:
+        definitions, definitions_failed = _timed_definitions(word)
+    return None, definitions, error, recipe_failed or definitions_failed
 
-@app.route("/", methods=["POST"])
-def home_post():
-    """Process search query and return JSON for AJAX (or render HTML for fallback)."""
-    original_word = request.form.get("word", "").strip()  # Keep original case for display
+def _timed_definitions(word):
+    with span(STAGE_SECONDS, "definitions"):
+        return get_definitions(word)
+
+def _timed_recipe(word):
+    with span(STAGE_SECONDS, "recipe"):
+        return get_food_recipe(word)
+
+def analyze_query(original_word):
+    """Classify and spell-correct one (stripped, non-empty) query, without any upstream calls.
+
+    Returns (result, word, query_type): result holds original_word, corrected_word and
+    correction_message (plus formula_detected/formula_latex for formulas), word is the
+    normalized query to look up.
+    """
     word = original_word.lower()  # For processing
     corrected_word = word  # Default to original
     correction_message = None
 
-    if not word:
-        if request.headers.get('Accept') == 'application/json':  # AJAX request
-            return jsonify({"error": "No query provided."})
-        else:  # Fallback form submit
-            return render_template_string(HTML_TEMPLATE, word=original_word, error="No query provided.")
-
     # Spell Correction Logic (skip for formulas)
-    formula_data = detect_formula(word)
+    with span(STAGE_SECONDS, "classify"):
+        query_type = query_classifier.classify(word)
+    if query_type == FORMULA:
+        with span(STAGE_SECONDS, "formula"):
+            formula_data = formula_result(word)
+    else:
+        formula_data = None
     if not formula_data:  # Only correct if not a formula
-        if len(word) < 15 and re.match(r'^[a-zA-Z\s]+$', word):  # Only correct short alphabetic words (skip symbols/numbers)
-            corrected_word = spell.correction(word)
+        if len(word) < 15 and CORRECTABLE_QUERY_RE.match(word):  # Only correct short alphabetic words (skip symbols/numbers)
+            with span(STAGE_SECONDS, "spell_correction"):
+                corrected_word = correct_spelling(word)
             if corrected_word and corrected_word != word:
-                logging.debug(f"Spell correction: '{word}' -> '{corrected_word}'")
+                logging.debug("Spell correction: '%s' -> '%s'", word, corrected_word)
                 correction_message = f"Did you mean '{corrected_word.title()}'? Using it for search."
                 word = corrected_word  # Use corrected for APIs
-
-    # Detect formula first (priority for math queries) - use corrected if applicable
+                with span(STAGE_SECONDS, "classify"):
+                    query_type = query_classifier.classify(word)
+
+    result = {
+        "original_word": original_word,
+        "corrected_word": corrected_word if corrected_word != original_word.lower() else None,
+        "correction_message": correction_message
+    }
+    # Detect formula first (priority for math queries)
     if formula_data:
-        response_data = {
-            "original_word": original_word,
-            "corrected_word": corrected_word if corrected_word != original_word.lower() else None,
-            "correction_message": correction_message
-        }
-        response_data.update(formula_data)
-        if request.headers.get('Accept') == 'application/json':
-            return jsonify(response_data)
-        else:
-            return render_template_string(HTML_TEMPLATE, 
-                                        word=original_word, 
-                                        corrected_word=corrected_word if corrected_word != original_word.lower() else None,
-                                        correction_message=correction_message,
-                                        formula_detected=formula_data["formula_detected"], 
-                                        formula_latex=formula_data["formula_latex"])
-
-    # Try recipe if food-related (use corrected word)
-    recipe = get_food_recipe(word)
-    if isinstance(recipe, dict) and "error" in recipe:
-        error = recipe["error"]
-        recipe = None
+        result.update(formula_data)
+    return result, word, query_type
+
+def process_query(original_word):
+    """Classify, spell-correct and look up one (stripped, non-empty) query.
+
+    Returns the template fields: original_word, corrected_word, correction_message, and either
+    formula_detected/formula_latex or recipe/definitions/error/transient (see lookup_word).
+    """
+    result, word, query_type = analyze_query(original_word)
+    if result.get("formula_detected"):
+        return result
+
+    # Recipe first if food-related, definitions as fallback (use corrected word)
+    recipe, definitions, error, transient = lookup_word(word, food=query_type == FOOD)
+    result.update(recipe=recipe, definitions=definitions, error=error, transient=transient)
+    return result
+
+def json_result(result):
+    """Shape a process_query result for the JSON API: only the winning recipe / definitions / error."""
+    if result.get("formula_detected"):
+        return result
+    response_data = {key: result[key] for key in ("original_word", "corrected_word", "correction_message")}
+    if result["recipe"]:
+        response_data["recipe"] = result["recipe"]
+    elif result["definitions"] and len(result["definitions"]) > 0:
+        response_data["definitions"] = result["definitions"]
+    elif result["error"]:
+        response_data["error"] = result["error"]
     else:
-        error = None
-
-    # Fallback to definitions if no recipe (use corrected word)
-    definitions = None
-    if not recipe:
-        definitions = get_definitions(word)
-
-    # Prepare response
-    if request.headers.get('Accept') == 'application/json':  # AJAX
-        response_data = {
-            "original_word": original_word,
-            "corrected_word": corrected_word if corrected_word != original_word.lower() else None,
-            "correction_message": correction_message
-        }
-        if recipe:
-            response_data["recipe"] = recipe
-        elif definitions and len(definitions) > 0:
-            response_data["definitions"] = definitions
-        elif error:
-            response_data["error"] = error
-        else:
-            response_data["error"] = "No relevant results found."
-        return jsonify(response_data)
+        response_data["error"] = "No relevant results found."
+    return response_data
+
+# --------- Streaming Lookups ---------
+def _recipe_event(recipe):
+    if isinstance(recipe, dict) and "error" in recipe:
+        return {"event": "recipe", "recipe": None, "error": recipe["error"]}
+    return {"event": "recipe", "recipe": recipe}
+
+def stream_query(original_word):
+    """Yield NDJSON events for one query as each part becomes known.
+
+    First a "query" event (correction, type and any formula), then a "recipe" and/or
+    "definitions" event per upstream result in completion order, then "done". A found
+    recipe outranks definitions, as in json_result, so it ends the stream early.
+    """
+    result, word, query_type = analyze_query(original_word)
+    yield json.dumps(dict(result, event="query", type=query_type)) + "\n"
+    if result.get("formula_detected"):
+        yield json.dumps({"event": "done"}) + "\n"
+        return
+    futures = {upstream_pool.submit(contextvars.copy_context().run, _timed_definitions, word): "definitions"}
+    if query_type == FOOD:
+        futures[upstream_pool.submit(contextvars.copy_context().run, _timed_recipe, word)] = "recipe"
+    try:
+        for future in as_completed(futures):
+            if futures[future] == "recipe":
+                recipe = future.result()
+                yield json.dumps(_recipe_event(recipe)) + "\n"
+                if recipe and not (isinstance(recipe, dict) and "error" in recipe):
+                    break
+            else:
+                try:
+                    definitions, _ = future.result()
+                except UpstreamBusy as e:
+                    yield json.dumps({"event": "definitions", "definitions": None, "error": str(e)}) + "\n"
+                    continue
+                yield json.dumps({"event": "definitions", "definitions": definitions}) + "\n"
+    finally:
+        for future in futures:
+            future.cancel()  # Recipe won or the client went away: drop lookups that haven't started
+    yield json.dumps({"event": "done"}) + "\n"
+
+# --------- Batch Lookups ---------
+BATCH_MAX_QUERIES = int(os.environ.get("BATCH_MAX_QUERIES", 100))
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", 8))
+# Separate from upstream_pool: batch jobs wait on upstream_pool futures themselves
+batch_pool = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="batch")
+
+def _safe_process_query(original_word):
+    try:
+        return json_result(process_query(original_word))
+    except AdmissionRejected as e:
+        return {"original_word": original_word, "error": str(e)}
+    except Exception as e:
+        logging.exception("Batch query error: %s", e)
+        return {"original_word": original_word, "error": "Lookup failed for this query."}
+
+def stream_batch(queries):
+    """Yield NDJSON lines for queries in input order, keeping at most BATCH_CONCURRENCY lookups in flight."""
+    keys = [q.strip().lower() for q in queries]
+    originals = {}
+    for query, key in zip(queries, keys):
+        if key:
+            originals.setdefault(key, query.strip())
+    pending = iter(originals)
+    futures = {}
+
+    def submit_next():
+        key = next(pending, None)
+        if key is not None:
+            futures[key] = batch_pool.submit(_safe_process_query, originals[key])
+
+    for _ in range(BATCH_CONCURRENCY):
+        submit_next()
+    consumed = set()
+    try:
+        for index, (query, key) in enumerate(zip(queries, keys)):
+            if not key:
+                result = {"error": "No query provided."}
+            else:
+                # Unique keys are submitted in first-seen order, so this one is always in flight or done
+                result = futures[key].result()
+                if key not in consumed:
+                    consumed.add(key)
+                    submit_next()
+                result = dict(result, original_word=query.strip())
+            yield json.dumps({"index": index, "query": query, "result": result}) + "\n"
+    finally:
+        for future in futures.values():
+            future.cancel()  # Client went away: drop lookups that haven't started
+
+# --------- Cached Lookups ---------
+LOOKUP_CACHE_TTL = int(os.environ.get("LOOKUP_CACHE_TTL", 3600))
+LOOKUP_NEGATIVE_TTL = int(os.environ.get("LOOKUP_NEGATIVE_TTL", 300))
+# Whole /lookup responses (canonical body + ETag) per normalized query
+lookup_cache = TieredCache(
+    LRUCache(maxsize=int(os.environ.get("LOOKUP_CACHE_SIZE", 4096)), ttl=LOOKUP_CACHE_TTL),
+    shared=shared_cache,
+    namespace="lookup",
+)
+lookup_flight = SingleFlight()
+
+def lookup_ttl(data, transient):
+    """Seconds a /lookup answer may be reused: 0 after upstream failures, short for "not found", else full TTL."""
+    if transient:
+        return 0
+    if "error" in data:
+        return LOOKUP_NEGATIVE_TTL if data["error"] == "No relevant results found." else 0
+    if data.get("definitions") == [WORD_NOT_FOUND]:
+        return LOOKUP_NEGATIVE_TTL
+    return LOOKUP_CACHE_TTL
+
+def get_lookup(key):
+    """Canonical response for a normalized query: {"body", "etag", "ttl"}, from the cache when possible."""
+    cached = lookup_cache.get(key)
+    if cached is not None:
+        return cached
+    return lookup_flight.do(key, _build_and_cache_lookup, key)
+
+def _build_and_cache_lookup(key):
+    result = process_query(key)
+    data = json_result(result)
+    with span(STAGE_SECONDS, "serialize"):
+        body = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    entry = {"body": body, "etag": hashlib.sha256(body.encode("utf-8")).hexdigest()[:32],
+             "ttl": lookup_ttl(data, result.get("transient", False))}
+    if entry["ttl"]:
+        lookup_cache.set(key, entry, ttl=entry["ttl"])
+    return entry
+
+# --------- Routes ---------
+@app.route("/", methods=["GET"])
+def home_get():
+    """Serve the initial HTML template (empty form), precompressed, answering revalidations with 304."""
+    response = Response(EMPTY_PAGE_BODIES["identity"], mimetype="text/html")
+    response.set_etag(EMPTY_PAGE_ETAG)
+    response.headers["Cache-Control"] = "no-cache"  # Always revalidate, usually a bodiless 304
+    response.make_conditional(request)
+    if response.status_code == 200:
+        set_encoded_body(response, EMPTY_PAGE_BODIES, choose_encoding(request.headers.get("Accept-Encoding")))
+    return response
+
+@app.route("/assets/<filename>", methods=["GET"])
+def asset(filename):
+    """Serve a content-hashed, minified static file from memory with far-future cache headers."""
+    if assets.source_name(filename) is None:
+        abort(404)
+    response = Response(mimetype=assets.mimetype(filename))
+    set_encoded_body(response, assets.bodies[filename], choose_encoding(request.headers.get("Accept-Encoding")))
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+@app.route("/", methods=["POST"])
+def home_post():
+    """Process search query and return JSON for AJAX (or render HTML for fallback)."""
+    original_word = request.form.get("word", "").strip()  # Keep original case for display
+
+    accept = request.headers.get('Accept')
+    if accept == 'application/x-ndjson':  # Progressive AJAX: one event per line as results arrive
+        if not original_word:
+            events = [{"event": "query", "error": "No query provided."}, {"event": "done"}]
+            return Response("".join(json.dumps(e) + "\n" for e in events), mimetype="application/x-ndjson")
+        response = Response(stream_with_context(stream_query(original_word)), mimetype="application/x-ndjson")
+        response.headers["X-Accel-Buffering"] = "no"  # Ask reverse proxies not to buffer the stream
+        return response
+
+    if not original_word:
+        if accept == 'application/json':  # AJAX request
+            return jsonify({"error": "No query provided."})
+        else:  # Fallback form submit
+            return render_page(word=original_word, error="No query provided.")
+
+    result = process_query(original_word)
+    if accept == 'application/json':  # AJAX
+        with span(STAGE_SECONDS, "serialize"):
+            return jsonify(json_result(result))
     else:  # Fallback: Render HTML with results
-        return render_template_string(HTML_TEMPLATE, 
-                                    word=original_word, 
-                                    corrected_word=corrected_word if corrected_word != original_word.lower() else None,
-                                    correction_message=correction_message,
-                                    recipe=recipe, 
-                                    definitions=definitions, 
-                                    error=error)
+        return render_page(word=original_word, **{k: v for k, v in result.items() if k != "original_word"})
+
+@app.route("/lookup", methods=["GET"])
+def lookup():
+    """Cacheable lookup of ?q=<query>: same fields as the POST / JSON answer, for the normalized query.
+
+    The body is canonical (sorted keys, no whitespace) so equal answers get equal strong ETags.
+    """
+    key = normalize_query(request.args.get("q", ""))
+    if not key:
+        return jsonify({"error": "No query provided."}), 400
+    entry = get_lookup(key)
+    response = Response(entry["body"], mimetype="application/json")
+    response.set_etag(entry["etag"])
+    if entry["ttl"]:
+        response.headers["Cache-Control"] = f"public, max-age={entry['ttl']}"
+    else:
+        response.headers["Cache-Control"] = "no-store"  # Upstream failure: let the next request retry
+    return response.make_conditional(request)
+
+@app.route("/suggest", methods=["GET"])
+def suggest():
+    """Top completions for ?q=<prefix> (optionally &k=<count>), most frequent first."""
+    prefix = request.args.get("q", "").strip().lower()
+    k = request.args.get("k", SUGGEST_DEFAULT_K, type=int)
+    response = jsonify({"query": prefix, "suggestions": get_suggest_index().complete(prefix, k)})
+    response.headers["Cache-Control"] = "public, max-age=86400"  # Only changes with the word list
+    return response
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    """Look up many queries at once; streams one NDJSON line per query, in input order.
+
+    Body: {"queries": ["apple", "x^2", ...]}. Repeated queries are only looked up once.
+    """
+    payload = request.get_json(silent=True)
+    queries = payload.get("queries") if isinstance(payload, dict) else None
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        return jsonify({"error": "Expected a JSON body like {\"queries\": [\"word\", ...]}."}), 400
+    if len(queries) > BATCH_MAX_QUERIES:
+        return jsonify({"error": f"At most {BATCH_MAX_QUERIES} queries per batch."}), 400
+    client_limiter.check(client_id(), cost=len(queries) - 1)  # One token per query; admit_client took the first
+    return Response(stream_batch(queries), mimetype="application/x-ndjson")
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    """Per-worker cache and spell-correction counters."""
+    return jsonify({
+        "definition_cache": definition_cache.stats(),
+        "spell_correction": correction_stats(),
+        "admission": {"rate_limited": client_limiter.limited,
+                      "upstreams": {client.name: client.limiter.stats() for client in (recipe_client, dictionary_client)}},
+        "lookup_cache": lookup_cache.stats(),
+        "recipe_store": recipe_store.stats() if recipe_store else None,
+        "coalescing": {"definitions": definition_flight.stats(), "recipes": recipe_flight.stats(), "lookups": lookup_flight.stats()},
+    })
+
+# Counters kept by the caches and helpers, read at scrape time
+metrics.callback("aidict_definition_cache_events_total", "Definition cache lookups and evictions in this worker.", ["event"],
+                 lambda: {(event,): definition_cache.stats()[key] for event, key in
+                          [("hit", "hits"), ("miss", "misses"), ("eviction", "evictions"), ("expiration", "expirations"),
+                           ("shared_hit", "shared_hits"), ("shared_error", "shared_errors")]},
+                 type="counter")
+metrics.callback("aidict_definition_cache_entries", "Definitions held in this worker's LRU.", [],
+                 lambda: {(): len(definition_cache.local)})
+metrics.callback("aidict_lookup_cache_events_total", "Full-response cache lookups for GET /lookup in this worker.", ["event"],
+                 lambda: {(event,): lookup_cache.stats()[key] for event, key in
+                          [("hit", "hits"), ("miss", "misses"), ("eviction", "evictions"), ("expiration", "expirations"),
+                           ("shared_hit", "shared_hits"), ("shared_error", "shared_errors")]},
+                 type="counter")
+metrics.callback("aidict_local_dictionary_lookups_total", "Offline dictionary index lookups.", ["result"],
+                 lambda: {("hit",): local_dictionary.hits, ("miss",): local_dictionary.misses} if local_dictionary else {},
+                 type="counter")
+metrics.callback("aidict_recipe_store_lookups_total", "Recipe store lookups (a miss costs a Spoonacular call).", ["result"],
+                 lambda: {("hit",): recipe_store.hits, ("miss",): recipe_store.misses} if recipe_store else {},
+                 type="counter")
+metrics.callback("aidict_spell_corrections_total", "Spell corrections by outcome (known and memoized skip the index).", ["outcome"],
+                 lambda: {(outcome,): count for outcome, count in correction_stats().items() if outcome in ("known", "memoized", "computed")},
+                 type="counter")
+metrics.callback("aidict_coalesced_calls_total", "Upstream fetches by single-flight role (coalesced = waited on another request's fetch).", ["lookup", "role"],
+                 lambda: {(lookup, role): flight.stats()[key] for lookup, flight in [("definitions", definition_flight), ("recipes", recipe_flight), ("lookups", lookup_flight)]
+                          for role, key in [("leader", "leaders"), ("coalesced", "coalesced")]},
+                 type="counter")
+metrics.callback("aidict_circuit_open", "1 while the upstream's circuit breaker is rejecting calls.", ["upstream"],
+                 lambda: {(client.name,): int(client.breaker.state != CircuitBreaker.CLOSED) for client in (recipe_client, dictionary_client)})
+metrics.callback("aidict_admission_rejected_total", "Requests refused by admission control (rate_limited = 429, shed = 503 for that upstream).", ["reason", "upstream"],
+                 lambda: {("rate_limited", ""): client_limiter.limited,
+                          **{("shed", client.name): client.limiter.shed for client in (recipe_client, dictionary_client)}},
+                 type="counter")
+metrics.callback("aidict_upstream_waiting", "Calls in this worker waiting for an upstream concurrency slot.", ["upstream"],
+                 lambda: {(client.name,): client.limiter.waiting for client in (recipe_client, dictionary_client)})
+metrics.callback("aidict_log_records_dropped_total", "Log records dropped because the log queue was full.", [],
+                 lambda: {(): dropped_records()}, type="counter")
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 # --------- Run App ---------
-import os
-
+# Local development only; production runs under gunicorn (see gunicorn.conf.py and procfile)
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
-    app.run(debug=True, host="0.0.0.0", port=port)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1", host="0.0.0.0", port=port)
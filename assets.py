@@ -0,0 +1,73 @@
+"""Content-hashed, minified and precompressed static assets.
+
+Each registered file is exposed as name.<hash>.ext, so its URL changes
+whenever its content does and browsers/CDNs can cache it forever. Files are
+minified and compressed once when the manifest is built (at startup, in the
+master process under gunicorn) and served from memory.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+
+from compression import precompress
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def minify_css(text):
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,>])\s*", r"\1", text)
+    text = re.sub(r":\s+", ":", text)
+    return text.replace(";}", "}").strip()
+
+
+def minify_js(text):
+    """Conservative: drop indentation, blank lines and whole-line // comments, keep every line break.
+
+    Line breaks stay so automatic semicolon insertion is unchanged; nothing inside a line is
+    touched, so strings, template literals and regexes are safe.
+    """
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//")) + "\n"
+
+
+def minify_html(text):
+    """Drop indentation and blank lines (the templates have no <pre> or <textarea>)."""
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+class AssetManifest:
+    def __init__(self, directory, names, minify=True):
+        self.directory = directory
+        self.hashed_names = {}  # app.css -> app.1a2b3c4d5e.css
+        self.source_names = {}  # app.1a2b3c4d5e.css -> app.css
+        self.bodies = {}  # app.1a2b3c4d5e.css -> {"identity": ..., "gzip": ..., "br": ...}
+        self.original_sizes = {}  # app.css -> bytes on disk
+        for name in names:
+            with open(os.path.join(directory, name), "rb") as f:
+                data = f.read()
+            self.original_sizes[name] = len(data)
+            stem, ext = os.path.splitext(name)
+            if minify and ext in MINIFIERS:
+                data = MINIFIERS[ext](data.decode("utf-8")).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            hashed = f"{stem}.{digest}{ext}"
+            self.hashed_names[name] = hashed
+            self.source_names[hashed] = name
+            self.bodies[hashed] = precompress(data)
+
+    def hashed_name(self, name):
+        return self.hashed_names[name]
+
+    def source_name(self, hashed):
+        """Original file name for a hashed name, or None if it isn't (or is no longer) current."""
+        return self.source_names.get(hashed)
+
+    def mimetype(self, hashed):
+        return mimetypes.guess_type(hashed)[0] or "application/octet-stream"
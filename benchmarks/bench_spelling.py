@@ -0,0 +1,91 @@
+"""Compare SymSpell against SpellChecker.correction: latency and agreement.
+
+    python benchmarks/bench_spelling.py [--queries 2000] [--seed 1]
+
+Queries are dictionary words drawn by frequency with 0-2 random edits
+applied, the same shape as real typos hitting home_post.
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellchecker import SpellChecker  # noqa: E402
+from spelling import SymSpell  # noqa: E402
+
+
+def make_typo(word, rng):
+    for _ in range(rng.choice([0, 1, 1, 2])):
+        i = rng.randrange(len(word) + 1)
+        op = rng.choice(["delete", "insert", "replace", "transpose"])
+        if op == "delete" and len(word) > 1 and i < len(word):
+            word = word[:i] + word[i + 1:]
+        elif op == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif op == "replace" and i < len(word):
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+        elif op == "transpose" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word
+
+
+def make_queries(frequencies, count, rng):
+    words = [w for w in frequencies if w.isalpha() and w.isascii() and 3 <= len(w) < 15]
+    weights = [frequencies[w] for w in words]
+    return [make_typo(w, rng) for w in rng.choices(words, weights=weights, k=count)]
+
+
+def time_calls(fn, queries):
+    timings, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def summarize(name, timings):
+    timings = sorted(timings)
+    pct = lambda p: timings[min(len(timings) - 1, int(p * len(timings)))] * 1e6  # noqa: E731
+    print(f"{name:<14} mean {statistics.mean(timings) * 1e6:9.1f}us  p50 {pct(0.50):9.1f}us  "
+          f"p95 {pct(0.95):9.1f}us  p99 {pct(0.99):9.1f}us  max {timings[-1] * 1e6:9.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    spell = SpellChecker()
+    frequencies = spell.word_frequency.dictionary
+    start = time.perf_counter()
+    index = SymSpell.from_frequencies(frequencies)
+    print(f"SymSpell build: {time.perf_counter() - start:.2f}s for {len(index.words)} words")
+
+    queries = make_queries(frequencies, args.queries, random.Random(args.seed))
+    sym_timings, sym_results = time_calls(index.correction, queries)
+    ref_timings, ref_results = time_calls(spell.correction, queries)
+
+    summarize("SpellChecker", ref_timings)
+    summarize("SymSpell", sym_timings)
+    print(f"Speedup (mean): {statistics.mean(ref_timings) / statistics.mean(sym_timings):.0f}x")
+
+    # SpellChecker breaks frequency ties arbitrarily, so equal-frequency picks count as agreement
+    agree = sum(
+        1 for r, s in zip(ref_results, sym_results)
+        if r == s or (r and s and frequencies[r] == frequencies[s])
+    )
+    print(f"Agreement: {agree}/{len(queries)} ({agree / len(queries):.2%})")
+    for q, r, s in zip(queries, ref_results, sym_results):
+        if r != s and not (r and s and frequencies[r] == frequencies[s]):
+            print(f"  differs: {q!r}: SpellChecker={r!r} SymSpell={s!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time from starting a server process to its first answered lookup.
+
+    python benchmarks/coldstart.py [--runs 5] [--server gunicorn|dev] [--output run.json]
+
+Each run starts a fresh process against local stub upstreams and polls
+POST / with a misspelled word (so the spell index must be ready) until it
+gets a JSON answer. Run it from a checkout of the version to measure; use
+--root to point at another checkout for a before/after comparison.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.report import write_results  # noqa: E402
+from benchmarks.stub_upstreams import start_stub  # noqa: E402
+
+COMMANDS = {
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+    "dev": [sys.executable, "app.py"],
+}
+
+
+def time_to_first_response(command, root, env, port, timeout=120):
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=root, env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                response = requests.post(url, data={"word": "recieve"}, headers={"Accept": "application/json"}, timeout=10)
+                if response.status_code == 200:
+                    return time.perf_counter() - start
+            except requests.RequestException:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"No response within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", choices=sorted(COMMANDS), default="gunicorn")
+    parser.add_argument("--root", default=ROOT, help="checkout to start the server from")
+    parser.add_argument("--port", type=int, default=5103)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    stub = start_stub(latency=0.0)
+    env = dict(os.environ, DICTIONARY_API_URL=stub.url, SPOONACULAR_API_URL=stub.url, LOG_LEVEL="WARNING")
+    if args.server == "gunicorn":
+        env.setdefault("WEB_CONCURRENCY", "2")
+    timings = []
+    for run in range(args.runs):
+        seconds = time_to_first_response(COMMANDS[args.server], args.root, env, args.port)
+        print(f"run {run + 1}: {seconds:.2f}s")
+        timings.append(seconds)
+    stub.shutdown()
+    results = {"first_response_s": {"median": statistics.median(timings), "min": min(timings), "max": max(timings)}}
+    print(f"{args.server}: median {results['first_response_s']['median']:.2f}s "
+          f"(min {results['first_response_s']['min']:.2f}s, max {results['first_response_s']['max']:.2f}s)")
+    if args.output:
+        write_results(args.output, "coldstart", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Realistic query corpus for benchmarks.
+
+Query popularity follows a Zipf distribution over dictionary words ranked by
+frequency (SpellChecker's English list), so a few thousand common words get
+most of the traffic. A share of queries are typos of those words, food
+queries or formulas, roughly matching what home_post sees.
+"""
+import random
+import string
+
+FORMULAS = [
+    "x^2 + y^2 = z^2", "a^2 + b^2 = c^2", "e = mc^2", "quadratic formula", "pythagoras theorem",
+    "integral of x^2", "f(x) = 3x + 2", "y = mx + b", "a*b = c", "sqrt(x) = 4", "∑ n", "√2",
+]
+FOODS = ["pasta", "chicken soup", "pizza", "apple cake", "banana bread", "curry", "sushi", "taco salad", "burger"]
+
+
+def ranked_words(limit=20000):
+    """Most frequent plain ASCII words from SpellChecker's list, most frequent first."""
+    from spellchecker import SpellChecker
+    frequencies = SpellChecker().word_frequency.dictionary
+    words = [w for w in frequencies if w.isalpha() and w.isascii() and 2 <= len(w) < 15]
+    words.sort(key=lambda w: -frequencies[w])
+    return words[:limit]
+
+
+def single_edit(word, rng):
+    i = rng.randrange(len(word))
+    op = rng.choice(["delete", "insert", "replace", "transpose"])
+    if op == "delete" and len(word) > 2:
+        return word[:i] + word[i + 1:]
+    if op == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if op == "transpose" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+
+
+def zipf_corpus(size=5000, vocabulary=20000, exponent=1.1, typo_rate=0.1, food_rate=0.05,
+                formula_rate=0.05, seed=42):
+    """Return `size` queries; popularity of the i-th most frequent word is proportional to 1 / i**exponent."""
+    rng = random.Random(seed)
+    words = ranked_words(vocabulary)
+    weights = [1 / (rank ** exponent) for rank in range(1, len(words) + 1)]
+    picks = rng.choices(words, weights=weights, k=size)
+    queries = []
+    for word in picks:
+        roll = rng.random()
+        if roll < formula_rate:
+            queries.append(rng.choice(FORMULAS))
+        elif roll < formula_rate + food_rate:
+            queries.append(rng.choice(FOODS))
+        elif roll < formula_rate + food_rate + typo_rate:
+            queries.append(single_edit(word, rng))
+        else:
+            queries.append(word)
+    return queries
@@ -0,0 +1,166 @@
+"""HTTP load driver for POST / lookups.
+
+Against a server that is already running:
+
+    python benchmarks/loadtest.py --url http://127.0.0.1:5000
+
+Or start the Flask development server and gunicorn (gunicorn.conf.py) one
+after the other against local stub upstreams and compare them:
+
+    python benchmarks/loadtest.py --compare --concurrency 32 --duration 15
+
+Queries come from the Zipfian corpus in benchmarks/corpus.py. In compare
+mode the stub upstreams can inject latency and errors (--upstream-latency,
+--recipe-latency, --error-rate); --output saves the results as JSON for
+benchmarks/report.py.
+"""
+import argparse
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import zipf_corpus  # noqa: E402
+from benchmarks.report import write_results  # noqa: E402
+from benchmarks.stub_upstreams import start_stub  # noqa: E402
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def run_load(url, queries, concurrency, duration, warmup=2.0):
+    """POST queries in order (wrapping around) from `concurrency` threads for `duration` seconds; returns a summary dict."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    counter = itertools.count()
+    start_at = time.perf_counter() + warmup
+    deadline = start_at + duration
+
+    def worker():
+        session = requests.Session()
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            query = queries[next(counter) % len(queries)]
+            begin = time.perf_counter()
+            try:
+                response = session.post(url + "/", data={"word": query}, headers={"Accept": "application/json"}, timeout=30)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - begin
+            if begin >= start_at:  # Ignore the warm-up period
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+        session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / duration,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def wait_until_ready(url, process, timeout=180):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if requests.get(url + "/", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {url} did not become ready in {timeout}s")
+
+
+def run_server(name, command, port, env, queries, args):
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(command, cwd=ROOT, env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(url, process)
+        print(f"Running {name} for {args.duration}s at concurrency {args.concurrency}...")
+        return run_load(url, queries, args.concurrency, args.duration)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def print_results(results):
+    print(f"{'server':<16}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['rps']:>10.1f}{r['mean_ms']:>10.1f}{r['p50_ms']:>10.1f}"
+              f"{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['errors']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server")
+    parser.add_argument("--compare", action="store_true", help="start and compare the dev server and gunicorn")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--queries", type=int, default=5000, help="corpus size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="stub upstream latency (compare mode)")
+    parser.add_argument("--recipe-latency", type=float, help="stub recipe endpoint latency (compare mode)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of stub upstream calls failing with 503")
+    parser.add_argument("--cache", action="store_true", help="keep the definition cache on (compare mode)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    if not args.url and not args.compare:
+        parser.error("pass --url or --compare")
+    queries = zipf_corpus(args.queries, seed=args.seed)
+
+    if args.url:
+        results = {args.url: run_load(args.url.rstrip("/"), queries, args.concurrency, args.duration)}
+    else:
+        stub = start_stub(latency=args.upstream_latency, error_rate=args.error_rate,
+                          recipe_latency=args.recipe_latency, seed=args.seed)
+        env = dict(os.environ, DICTIONARY_API_URL=stub.url, SPOONACULAR_API_URL=stub.url, LOG_LEVEL="WARNING")
+        if not args.cache:
+            env["DEFINITION_CACHE_SIZE"] = "0"  # Every word lookup pays the upstream round trip
+        results = {
+            "flask dev server": run_server("flask dev server", [sys.executable, "app.py"], 5101, env, queries, args),
+            "gunicorn": run_server("gunicorn", [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                                   5102, env, queries, args),
+        }
+        stub.shutdown()
+    print_results(results)
+    if args.output:
+        write_results(args.output, "loadtest", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
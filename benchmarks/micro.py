@@ -0,0 +1,84 @@
+"""Micro-benchmarks for the CPU-bound steps of process_query.
+
+    python benchmarks/micro.py [--queries 5000] [--output results.json]
+
+Each function runs over the same Zipfian corpus (benchmarks/corpus.py) as
+the load test. Upstream calls are never made: only classification and
+spell correction are timed. Importing app builds or loads the spell index,
+so set SPELL_INDEX_PATH to a snapshot to keep start-up short.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import zipf_corpus  # noqa: E402
+from benchmarks.report import write_results  # noqa: E402
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p * len(sorted_values)))]
+
+
+def time_calls(fn, queries):
+    """Call fn once per query; returns a summary in microseconds."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_us": statistics.mean(timings) * 1e6,
+        "p50_us": percentile(timings, 0.50) * 1e6,
+        "p95_us": percentile(timings, 0.95) * 1e6,
+        "p99_us": percentile(timings, 0.99) * 1e6,
+        "max_us": timings[-1] * 1e6,
+    }
+
+
+def run_micro(queries, slow_queries=None):
+    """Time every pipeline step over `queries`; SpellChecker.correction gets the (shorter) `slow_queries`."""
+    import app
+    from spellchecker import SpellChecker
+    spell = SpellChecker()
+    words = [q.strip().lower() for q in queries if app.CORRECTABLE_QUERY_RE.match(q.strip().lower())]
+    slow_queries = words[:500] if slow_queries is None else slow_queries
+    app.correction_memo.clear()
+    return {
+        "classify": time_calls(app.query_classifier.classify, queries),
+        "detect_formula": time_calls(app.detect_formula, queries),
+        "is_food_related": time_calls(app.is_food_related, queries),
+        "spell_index.correction": time_calls(app.spell_index.correction, words),
+        "correct_spelling": time_calls(app.correct_spelling, words),  # Memoized: repeats hit correction_memo
+        "spell.correction": time_calls(spell.correction, slow_queries),
+    }
+
+
+def print_micro(results):
+    print(f"{'function':<24}{'calls':>8}{'mean us':>11}{'p50 us':>11}{'p95 us':>11}{'p99 us':>11}{'max us':>11}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['calls']:>8}{r['mean_us']:>11.1f}{r['p50_us']:>11.1f}"
+              f"{r['p95_us']:>11.1f}{r['p99_us']:>11.1f}{r['max_us']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run_micro(zipf_corpus(args.queries, seed=args.seed))
+    print_micro(results)
+    if args.output:
+        write_results(args.output, "micro", {"queries": args.queries, "seed": args.seed}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Bytes per request for a mobile-heavy traffic mix, by response encoding.
+
+    python benchmarks/payload.py [--queries 200] [--output run.json]
+
+Drives the app in-process (Flask test client) against local stub upstreams
+and measures response body sizes for each kind of request: unminified and
+uncompressed (what the app served before), minified, and each encoding the
+app offers. The weights model mostly-mobile traffic, where caches are small
+and often cold, so first visits (page + CSS + JS) are a large share.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import zipf_corpus  # noqa: E402
+from benchmarks.report import write_results  # noqa: E402
+from benchmarks.stub_upstreams import start_stub  # noqa: E402
+from compression import ENCODINGS, precompress  # noqa: E402
+
+# Share of requests of each kind
+MIX = {
+    "page": 0.10,
+    "app.css": 0.08,
+    "app.js": 0.08,
+    "lookup_json": 0.44,
+    "lookup_get": 0.20,
+    "form_post": 0.10,
+}
+
+
+def request_kinds(app_module, queries):
+    """Each kind of request as a function (client, headers, query) -> response."""
+    assets = app_module.assets
+    return {
+        "page": lambda c, h, q: c.get("/", headers=h),
+        "app.css": lambda c, h, q: c.get(f"/assets/{assets.hashed_name('app.css')}", headers=h),
+        "app.js": lambda c, h, q: c.get(f"/assets/{assets.hashed_name('app.js')}", headers=h),
+        "lookup_json": lambda c, h, q: c.post("/", data={"word": q}, headers=dict(h, Accept="application/json")),
+        "lookup_get": lambda c, h, q: c.get("/lookup", query_string={"q": q}, headers=h),
+        "form_post": lambda c, h, q: c.post("/", data={"word": q}, headers=h),
+    }
+
+
+def mean_bytes(client, send, headers, queries):
+    sizes = []
+    for query in queries:
+        response = send(client, headers, query)
+        sizes.append(len(response.get_data()))
+    return sum(sizes) / len(sizes)
+
+
+def measure(app_module, queries):
+    """Mean body bytes per request kind for identity and each offered encoding."""
+    client = app_module.app.test_client()
+    results = {}
+    for kind, send in request_kinds(app_module, queries).items():
+        results[kind] = {"identity": mean_bytes(client, send, {}, queries)}
+        for encoding in ENCODINGS:
+            results[kind][encoding] = mean_bytes(client, send, {"Accept-Encoding": encoding}, queries)
+    return results
+
+
+def unminified(app_module):
+    """Swap in the unminified template and assets; the identity sizes are then the old payloads."""
+    from assets import AssetManifest
+
+    app_module.page_template = app_module.app.jinja_env.from_string(app_module.HTML_TEMPLATE)
+    app_module.assets = AssetManifest(app_module.app.static_folder, ["app.css", "app.js"], minify=False)
+    page = app_module.render_page().encode("utf-8")
+    app_module.EMPTY_PAGE_BODIES = precompress(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200, help="queries per request kind")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    stub = start_stub(latency=0.0)
+    os.environ.update(DICTIONARY_API_URL=stub.url, SPOONACULAR_API_URL=stub.url, LOG_LEVEL="WARNING",
+                      RECIPE_STORE_PATH=os.path.join(tempfile.mkdtemp(), "recipes.db"))
+    import app as app_module
+
+    queries = zipf_corpus(args.queries, seed=args.seed)
+    minified = measure(app_module, queries)
+    unminified(app_module)
+    original = measure(app_module, queries)
+    stub.shutdown()
+
+    columns = ["original", "minified", *ENCODINGS]
+    results = {}
+    for kind in MIX:
+        results[kind] = {"original": original[kind]["identity"], "minified": minified[kind]["identity"],
+                         **{encoding: minified[kind][encoding] for encoding in ENCODINGS}}
+    results["weighted"] = {column: sum(MIX[kind] * results[kind][column] for kind in MIX) for column in columns}
+
+    print(f"{'request':<12} {'share':>6} " + " ".join(f"{column:>9}" for column in columns))
+    for kind, row in results.items():
+        share = f"{MIX[kind]:.0%}" if kind in MIX else ""
+        print(f"{kind:<12} {share:>6} " + " ".join(f"{row[column]:>9.0f}" for column in columns))
+    best = min(results["weighted"][encoding] for encoding in ENCODINGS)
+    print(f"bytes per request: {results['weighted']['original']:.0f} -> {best:.0f} "
+          f"({1 - best / results['weighted']['original']:.0%} smaller)")
+    if args.output:
+        write_results(args.output, "payload", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
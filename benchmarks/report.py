@@ -0,0 +1,72 @@
+"""JSON result files for benchmark runs, and a diff between two of them.
+
+    python benchmarks/report.py before.json after.json
+
+Every file records when and where it ran (git commit, Python, CPU count)
+next to the configuration and the results, so runs stay comparable over
+time. The diff prints each numeric metric present in both files with its
+relative change.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmark, config, results):
+    document = {
+        "benchmark": benchmark,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"before: {before.get('commit')} {before.get('timestamp')}   after: {after.get('commit')} {after.get('timestamp')}")
+    old = dict(flatten(before["results"]))
+    for name, value in flatten(after["results"]):
+        if name not in old:
+            continue
+        change = f"{(value - old[name]) / old[name] * 100:+7.1f}%" if old[name] else "      -"
+        print(f"{name:<48}{old[name]:>12.1f}{value:>12.1f}  {change}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
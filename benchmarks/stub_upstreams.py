@@ -0,0 +1,100 @@
+"""Local stand-ins for dictionaryapi.dev and Spoonacular.
+
+    python benchmarks/stub_upstreams.py --port 8900 --latency 0.05
+
+then run the app with DICTIONARY_API_URL / SPOONACULAR_API_URL pointing at
+http://127.0.0.1:8900. Every response waits `latency` seconds first (the
+recipe endpoint can be given its own latency), and a fraction `error_rate`
+of requests fail with a 503.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server
+        parsed = urlparse(self.path)
+        recipe = parsed.path == "/recipes/complexSearch"
+        time.sleep(stub.recipe_latency if recipe else stub.latency)
+        with stub.lock:
+            stub.requests += 1
+            failed = stub.error_rate and stub.rng.random() < stub.error_rate
+        if failed:
+            self._send(503, {"message": "Stub upstream error"})
+        elif parsed.path.startswith("/api/v2/entries/en/"):
+            word = unquote(parsed.path.rsplit("/", 1)[1])
+            if word.startswith("zz"):  # Convention for "not in the dictionary"
+                self._send(404, {"title": "No Definitions Found"})
+            else:
+                self._send(200, [{
+                    "word": word,
+                    "meanings": [{"partOfSpeech": "noun", "definitions": [{"definition": f"Stub definition of {word}."}]}],
+                }])
+        elif recipe:
+            query = parse_qs(parsed.query).get("query", [""])[0]
+            self._send(200, {"results": [{
+                "title": f"Stub {query} recipe",
+                "extendedIngredients": [{"original": f"{i} cups of {query}"} for i in range(1, 4)],
+                "instructions": "Mix.\nCook.\nServe.",
+            }]})
+        else:
+            self._send(404, {})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.05, error_rate=0.0, recipe_latency=None, seed=None):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.recipe_latency = latency if recipe_latency is None else recipe_latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+def start_stub(port=0, latency=0.05, error_rate=0.0, recipe_latency=None, seed=None):
+    """Start a stub server on a background thread and return it (server.url, server.shutdown())."""
+    server = StubServer(port, latency, error_rate, recipe_latency, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--recipe-latency", type=float, help="latency for the recipe endpoint (default: --latency)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+    server = StubServer(args.port, args.latency, args.error_rate, args.recipe_latency)
+    print(f"Stub upstreams listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
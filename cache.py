@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """In-process LRU cache with a size bound and a TTL per entry."""
+
+    def __init__(self, maxsize=2048, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SharedBackend(ABC):
+    """Interface for a cache shared between worker processes.
+
+    Values are JSON strings; implementations only need get/set with a TTL.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """Return the stored string for key, or None."""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """Store the string value under key for ttl seconds."""
+
+
+class RedisBackend(SharedBackend):
+    def __init__(self, url):
+        import redis  # Optional dependency, only needed for a shared cache
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.setex(key, max(1, int(ttl)), value)
+
+
+def make_backend(url):
+    """Build a shared backend from a URL, or return None if none is configured."""
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+class TieredCache:
+    """Local LRU in front of an optional shared backend.
+
+    Shared-backend errors are logged and treated as misses so a cache outage
+    never fails a request.
+    """
+
+    def __init__(self, local, shared=None, namespace="cache"):
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace
+        self.shared_hits = 0
+        self.shared_errors = 0
+
+    def _shared_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.shared is None:
+            return default
+        try:
+            raw = self.shared.get(self._shared_key(key))
+        except Exception as e:
+            self.shared_errors += 1
+            logging.warning("Shared cache read failed: %s", e)
+            return default
+        if raw is None:
+            return default
+        payload = json.loads(raw)
+        remaining = payload["expires_at"] - time.time()
+        if remaining <= 0:
+            return default
+        self.shared_hits += 1
+        self.local.set(key, payload["value"], ttl=remaining)
+        return payload["value"]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.local.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=ttl)
+        if self.shared is None:
+            return
+        payload = json.dumps({"value": value, "expires_at": time.time() + ttl})
+        try:
+            self.shared.set(self._shared_key(key), payload, ttl)
+        except Exception as e:
+            self.shared_errors += 1
+            logging.warning("Shared cache write failed: %s", e)
+
+    def stats(self):
+        stats = self.local.stats()
+        stats["shared_hits"] = self.shared_hits
+        stats["shared_errors"] = self.shared_errors
+        return stats
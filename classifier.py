@@ -0,0 +1,76 @@
+"""Single-pass query classification into formula, food or plain word.
+
+Keyword sets are compiled once into trie-shaped regular expressions, so a
+scan costs roughly the length of the query rather than the number of
+keywords, and the sets can grow to thousands of entries. Keywords can be
+loaded from a JSON file of the form {"formula": [...], "food": [...]}.
+"""
+import json
+import re
+
+FORMULA = "formula"
+FOOD = "food"
+WORD = "word"
+
+MATH_SYMBOLS = r'[\+\-\*/=^∫∑√\$\$\{\}\$\$]'
+
+
+def trie_pattern(words):
+    """Regex matching any of words, factored by common prefixes (e.g. pasta|pastry -> past(?:a|ry))."""
+    trie = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return _node_pattern(trie) if trie else None
+
+
+def _node_pattern(node):
+    ends_here = "" in node
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    if len(branches) > 1 or ends_here:
+        return "(?:" + "|".join(branches) + ")" + ("?" if ends_here else "")
+    return branches[0]
+
+
+class QueryClassifier:
+    def __init__(self, formula_keywords, food_keywords, math_symbols=MATH_SYMBOLS):
+        self.formula_keywords = frozenset(kw.lower() for kw in formula_keywords)
+        self.food_keywords = frozenset(kw.lower() for kw in food_keywords)
+        formula_alternatives = [math_symbols]
+        formula_keywords_pattern = trie_pattern(self.formula_keywords)
+        if formula_keywords_pattern:
+            formula_alternatives.append(formula_keywords_pattern)
+        formula_pattern = "|".join(formula_alternatives)
+        food_pattern = trie_pattern(self.food_keywords) or "(?!)"
+        self._formula_re = re.compile(formula_pattern, re.IGNORECASE)
+        self._food_re = re.compile(food_pattern)
+        # Zero-width lookahead at every position, formula tried first, so overlapping keywords are all seen
+        self._combined_re = re.compile(f"(?=(?P<formula>{formula_pattern})|(?P<food>{food_pattern}))", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path, formula_keywords=(), food_keywords=()):
+        """Load keyword sets from a JSON file; a set missing from the file falls back to the given default."""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("formula", formula_keywords), config.get("food", food_keywords))
+
+    def classify(self, query):
+        """Return FORMULA, FOOD or WORD. Formula wins over food wherever it occurs in the query."""
+        food = False
+        for match in self._combined_re.finditer(query):
+            if match.group("formula") is not None:
+                return FORMULA
+            food = True
+        return FOOD if food else WORD
+
+    def is_formula(self, query):
+        return self._formula_re.search(query) is not None
+
+    def is_food(self, query):
+        return self._food_re.search(query.lower()) is not None
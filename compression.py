@@ -0,0 +1,132 @@
+"""Response compression negotiated from Accept-Encoding.
+
+Dynamic responses (JSON, rendered pages) are compressed per request at a
+fast level once they reach a minimum size; bodies that never change (the
+empty page, static assets) are compressed once at the highest level with
+precompress() and served from memory. Brotli needs the optional `brotli`
+package; without it only gzip is offered.
+
+A compressed response is a different representation, so its strong ETag
+gets an encoding suffix ("abc-gzip"); strip_etag_suffixes() undoes that on
+If-None-Match before the app compares tags.
+"""
+import gzip
+import re
+
+try:
+    import brotli  # Optional dependency, only needed for Content-Encoding: br
+except ImportError:
+    brotli = None
+
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)  # Preferred first
+COMPRESSIBLE_MIMETYPES = {
+    "text/html", "text/css", "text/plain", "text/javascript", "application/javascript", "application/json",
+    "image/svg+xml",
+}
+_ETAG_SUFFIX_RE = re.compile(r'-(br|gzip)"')
+
+
+def accepted_encodings(header):
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, available=ENCODINGS):
+    """Best encoding from `available` the client accepts, or None for identity."""
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, best=False):
+    """Compress bytes; `best` trades CPU for size and is meant for bodies compressed once."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else 5)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def precompress(data):
+    """Every representation of a fixed body: {"identity": data, "gzip": ..., "br": ...}."""
+    bodies = {"identity": data}
+    for encoding in ENCODINGS:
+        bodies[encoding] = compress(data, encoding, best=True)
+    return bodies
+
+
+def strip_etag_suffixes(environ):
+    """Turn If-None-Match tags for compressed representations back into the app's own tags.
+
+    Returns the encoding of the (first) suffixed tag, for compress_response to put back on a 304.
+    """
+    header = environ.get("HTTP_IF_NONE_MATCH")
+    if not header or "-" not in header:
+        return None
+    match = _ETAG_SUFFIX_RE.search(header)
+    if match is None:
+        return None
+    environ["HTTP_IF_NONE_MATCH"] = _ETAG_SUFFIX_RE.sub('"', header)
+    return match.group(1)
+
+
+def set_encoded_body(response, bodies, encoding):
+    """Serve one of precompress()'s representations on response."""
+    response.set_data(bodies[encoding or "identity"])
+    _mark_encoded(response, encoding)
+
+
+def compress_response(response, accept_encoding, min_size, etag_encoding=None):
+    """Compress a buffered, compressible response body in place if it is at least min_size bytes.
+
+    etag_encoding is what strip_etag_suffixes returned: a 304 then carries the same tag
+    as the compressed representation the client revalidated.
+    """
+    if response.status_code == 304:
+        etag, weak = response.get_etag()
+        if etag and etag_encoding:
+            response.set_etag(f"{etag}-{etag_encoding}", weak=weak)
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    response.vary.add("Accept-Encoding")
+    if (response.direct_passthrough or response.is_streamed or "Content-Encoding" in response.headers
+            or response.status_code < 200 or response.status_code in (204, 206)):
+        return response
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    response.set_data(compress(data, encoding))
+    _mark_encoded(response, encoding)
+    return response
+
+
+def _mark_encoded(response, encoding):
+    response.vary.add("Accept-Encoding")
+    if encoding is None:
+        return
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
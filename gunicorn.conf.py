@@ -0,0 +1,43 @@
+"""Production server settings: gunicorn -c gunicorn.conf.py app:app
+
+Requests mostly wait on upstream APIs, so each worker process runs several
+threads. The app (including the memory-mapped spell index) is imported
+once in the master before forking, so workers share that memory instead
+of each loading its own copy.
+
+Every setting can be overridden from the environment. Send HUP for a
+graceful restart of all workers (config changes only: with preload_app the
+app code itself needs a full restart or USR2 binary upgrade).
+"""
+import gc
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# One process per core keeps CPU-bound work (spell correction, rendering) parallel, with at
+# least two so a recycling worker never leaves the server with none. Threads cover the
+# I/O-bound upstream waits inside each process.
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+preload_app = True
+
+# Recycle workers periodically to cap slow memory growth; jitter avoids restarting all at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None  # e.g. "-" for stdout
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the GC's tracking so collections in the
+    # workers don't touch (and un-share) the preloaded pages.
+    gc.freeze()
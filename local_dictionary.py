@@ -0,0 +1,158 @@
+"""Offline definition store backed by a read-only SQLite index.
+
+Build an index from a bulk dump, then point LOCAL_DICTIONARY_PATH at it:
+
+    python local_dictionary.py build dump.json data/dictionary.db
+
+The dump can be a JSON list of dictionaryapi.dev entries, a JSON object
+mapping words to lists of definition strings, or JSON Lines with one
+dictionaryapi.dev entry per line. An entry may also be a whole API response
+(a list of entries, of which the first is used, as in the app).
+"""
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+
+
+def extract_definitions(entry, max_meanings=2, max_per_meaning=2):
+    """Flatten one dictionaryapi.dev entry into "pos: text" strings."""
+    definitions = []
+    for meaning in entry.get("meanings", [])[:max_meanings]:
+        pos = meaning.get("partOfSpeech", "n.")
+        for defn in meaning.get("definitions", [])[:max_per_meaning]:
+            text = defn.get("definition", "").strip()
+            if text:
+                definitions.append(f"{pos}: {text}")
+    return definitions
+
+
+def _read_records(f, jsonl):
+    if not jsonl:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            f.seek(0)  # Not a single JSON document: JSON Lines, whatever the extension
+        else:
+            yield from (data.items() if isinstance(data, dict) else data)
+            return
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_dump(path):
+    """Yield (word, definitions) pairs from a dump file."""
+    with open(path, encoding="utf-8") as f:
+        for record in _read_records(f, jsonl=path.endswith(".jsonl")):
+            if isinstance(record, tuple):
+                word, definitions = record
+                if definitions and isinstance(definitions[0], dict):
+                    definitions = extract_definitions(definitions[0])
+            else:
+                if isinstance(record, list):  # A whole API response
+                    if not record:
+                        continue
+                    record = record[0]
+                word, definitions = record.get("word", ""), extract_definitions(record)
+            word = word.strip().lower()
+            if word and definitions:
+                yield word, definitions
+
+
+def build_index(dump_path, index_path, batch_size=5000):
+    """Ingest a dump into a fresh SQLite index. Returns the number of words stored."""
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("CREATE TABLE definitions (word TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID")
+        count = 0
+        batch = []
+        for word, definitions in iter_dump(dump_path):
+            batch.append((word, json.dumps(definitions, ensure_ascii=False)))
+            if len(batch) >= batch_size:
+                count += _insert(conn, batch)
+                batch = []
+        count += _insert(conn, batch)
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        os.replace(tmp_path, index_path)  # Atomic swap so running workers never see a half-built file
+    finally:
+        conn.close()  # No-op if already closed
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)  # Only left behind by a failed build
+    return count
+
+
+def _insert(conn, batch):
+    # First entry wins for words that appear several times in a dump
+    before = conn.total_changes
+    conn.executemany("INSERT OR IGNORE INTO definitions (word, data) VALUES (?, ?)", batch)
+    return conn.total_changes - before
+
+
+class LocalDictionary:
+    """Read-only lookups against a prebuilt index.
+
+    Pages are memory-mapped by SQLite on demand, so opening the index costs
+    nothing up front and only hot pages end up resident. Each thread gets its
+    own connection.
+    """
+
+    def __init__(self, path, mmap_size=256 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, path):
+        """Return a LocalDictionary for path, or None if no index has been built."""
+        if not path or not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, word):
+        try:
+            row = self._connection().execute(
+                "SELECT data FROM definitions WHERE word = ?", (word.strip().lower(),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error("Local dictionary error: %s", e)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+
+def main(argv):
+    if len(argv) != 4 or argv[1] != "build":
+        print("Usage: python local_dictionary.py build <dump.json|dump.jsonl> <index.db>")
+        return 2
+    count = build_index(argv[2], argv[3])
+    print(f"Indexed {count} words into {argv[3]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
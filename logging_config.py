@@ -0,0 +1,110 @@
+"""Logging setup: env-driven level, optional JSON records, non-blocking writes.
+
+Request threads only put records on a bounded in-memory queue; a background
+QueueListener thread formats and writes them. When the queue is full new
+records are dropped (and counted) rather than blocking the request.
+
+    LOG_LEVEL   DEBUG / INFO / WARNING / ... (default INFO)
+    LOG_FORMAT  json or text (default json)
+    LOG_QUEUE_SIZE  max records buffered before dropping (default 10000)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and goes into the JSON record
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Leave message formatting to the listener thread; records never leave this process
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_queue_handler = None
+
+
+def configure_logging(level=None, fmt=None, queue_size=None):
+    """Route all logging through a queue drained by a background thread. Safe to call more than once."""
+    global _listener, _queue_handler
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.environ.get("LOG_FORMAT", "json")).lower()
+    queue_size = int(queue_size or os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"))
+
+    if _listener is not None:
+        _listener.stop()
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_listener_after_fork():
+    # Only the forking thread survives fork(), so a pre-fork server's workers need their own listener
+    # thread, and a fresh queue in case the parent's lock was held at fork time.
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()  # Flushes whatever is still queued
+
+
+os.register_at_fork(after_in_child=_restart_listener_after_fork)
+atexit.register(_stop_listener)
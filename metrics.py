@@ -0,0 +1,175 @@
+"""Minimal in-process metrics with Prometheus text exposition, plus sampled request traces.
+
+Metrics are per process: behind a pre-fork server each worker reports its
+own values, so scrape workers individually or aggregate by instance.
+"""
+import bisect
+import contextvars
+import logging
+import random
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Spans recorded during the current (sampled) request, or None when not tracing
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            yield self.name, _format_labels(self.labelnames, labelvalues), value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labelvalues, list(series)) for labelvalues, series in self._series.items()]
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield self.name + "_bucket", _format_labels(self.labelnames, labelvalues, [("le", _format_value(bound))]), cumulative
+            yield self.name + "_bucket", _format_labels(self.labelnames, labelvalues, [("le", "+Inf")]), series[-1]
+            yield self.name + "_sum", _format_labels(self.labelnames, labelvalues), series[-2]
+            yield self.name + "_count", _format_labels(self.labelnames, labelvalues), series[-1]
+
+
+class CallbackMetric:
+    """Values read at scrape time from fn(), which returns {labelvalues tuple: value}."""
+
+    def __init__(self, name, documentation, labelnames, fn, type="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.type = type
+        self.fn = fn
+
+    def samples(self):
+        for labelvalues, value in self.fn().items():
+            yield self.name, _format_labels(self.labelnames, labelvalues), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def callback(self, *args, **kwargs):
+        return self.register(CallbackMetric(*args, **kwargs))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class span:
+    """Time a block into histogram (with the given label values) and the current trace, if any.
+
+        with span(STAGE_SECONDS, "spell_correction"):
+            ...
+    """
+
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram, *labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed, *self.labelvalues)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((self.histogram.name, self.labelvalues, elapsed))
+        return False
+
+
+def start_trace(sample_rate):
+    """Start collecting spans for this request with probability sample_rate. Returns a token for finish_trace."""
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        return None
+    return _trace.set([])
+
+
+def finish_trace(token, description):
+    """Log the spans collected since start_trace (no-op if the request wasn't sampled)."""
+    if token is None:
+        return
+    spans = _trace.get()
+    _trace.reset(token)
+    parts = " ".join(f"{'/'.join(map(str, labels))}={elapsed * 1000:.2f}ms" for _, labels, elapsed in spans)
+    logging.info("trace %s %s", description, parts)
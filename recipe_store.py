@@ -0,0 +1,136 @@
+"""Persistent store of trimmed Spoonacular recipes, keyed by normalized query.
+
+Only the fields the page shows are kept (title, up to 10 ingredients,
+flattened instructions), as a slotted Recipe on the way in and out and as
+plain columns in SQLite on disk. Found recipes never expire, so a repeat
+food query never spends Spoonacular quota; "no results" answers are kept
+for `negative_ttl` seconds. The file is shared by every worker process
+(WAL mode), and decoded recipes are kept in a small in-process LRU.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from cache import LRUCache
+
+MAX_INGREDIENTS = 10
+_MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class Recipe:
+    title: str
+    ingredients: tuple
+    instructions: str
+
+    @classmethod
+    def from_result(cls, result, query):
+        """Trim one complexSearch result (with addRecipeInformation) down to what the page shows."""
+        # Spoonacular sends null for missing fields, so fall back on any falsy value, not just absent keys
+        ingredients = [i["original"].strip() for i in result.get("extendedIngredients") or [] if i.get("original")]
+        return cls(
+            title=result.get("title") or f"{query.title()} Recipe",
+            ingredients=tuple(" ".join(i.split()) for i in ingredients[:MAX_INGREDIENTS]),
+            instructions=(result.get("instructions") or "No instructions available.").replace('\n', ' '),
+        )
+
+    def as_dict(self):
+        return {"title": self.title, "ingredients": list(self.ingredients), "instructions": self.instructions}
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class RecipeStore:
+    """Recipe (or "no results") per normalized query, persisted in SQLite.
+
+    get() returns a Recipe, None for a remembered "no results", or `default`
+    if the query has never been fetched. Storage errors are logged and
+    treated as misses so a bad disk never fails a request.
+    """
+
+    def __init__(self, path, negative_ttl=7 * 24 * 3600, memory_size=1024):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(maxsize=memory_size, ttl=float("inf"))
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()  # Not kept: connections must not cross a pre-fork server's fork
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS recipes (query TEXT PRIMARY KEY, title TEXT, ingredients TEXT,"
+                     " instructions TEXT, fetched_at REAL NOT NULL) WITHOUT ROWID")
+        conn.close()
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        """Return a RecipeStore for path, or None if disabled (empty path) or the file can't be opened."""
+        if not path:
+            return None
+        try:
+            return cls(path, **kwargs)
+        except (OSError, sqlite3.Error) as e:
+            logging.error("Recipe store disabled, cannot open %s: %s", path, e)
+            return None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def get(self, query, default=None):
+        key = normalize_query(query)
+        recipe = self.memory.get(key, _MISSING)
+        if recipe is _MISSING:
+            recipe = self._load(key)
+            if recipe is not _MISSING:
+                self.memory.set(key, recipe, ttl=None if recipe else self.negative_ttl)
+        if recipe is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return recipe
+
+    def _load(self, key):
+        try:
+            row = self._connection().execute(
+                "SELECT title, ingredients, instructions, fetched_at FROM recipes WHERE query = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error("Recipe store read failed: %s", e)
+            return _MISSING
+        if row is None:
+            return _MISSING
+        title, ingredients, instructions, fetched_at = row
+        if title is None:
+            return None if time.time() - fetched_at < self.negative_ttl else _MISSING
+        return Recipe(title, tuple(ingredients.split("\n")) if ingredients else (), instructions)
+
+    def put(self, query, recipe):
+        """Remember a Recipe, or None for "no results", for query."""
+        key = normalize_query(query)
+        self.memory.set(key, recipe, ttl=None if recipe else self.negative_ttl)
+        row = (key, recipe.title, "\n".join(recipe.ingredients), recipe.instructions) if recipe else (key, None, None, None)
+        try:
+            with self._connection() as conn:
+                conn.execute("INSERT OR REPLACE INTO recipes (query, title, ingredients, instructions, fetched_at)"
+                             " VALUES (?, ?, ?, ?, ?)", row + (time.time(),))
+        except sqlite3.Error as e:
+            logging.error("Recipe store write failed: %s", e)
+
+    def __contains__(self, query):
+        return self.get(query, _MISSING) is not _MISSING
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memory": self.memory.stats()}
@@ -0,0 +1,40 @@
+"""Request coalescing: concurrent calls for the same key share one execution."""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.leaders = 0  # Calls that actually ran fn
+        self.coalesced = 0  # Calls that waited on someone else's run instead
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless a call for key is already running, in which case wait
+        for that one and return its result (or raise its exception)."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = Future()
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        return {"in_flight": len(self._in_flight), "leaders": self.leaders, "coalesced": self.coalesced}
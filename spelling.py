@@ -0,0 +1,329 @@
+"""Symmetric-delete (SymSpell-style) spelling correction.
+
+Every dictionary word is indexed under all strings reachable by deleting up
+to `max_distance` characters from its first `prefix_length` characters. A
+query only has to generate its own deletes and look them up, then verify the
+handful of candidates with a bounded edit distance, instead of generating
+every possible edit like SpellChecker.correction does.
+
+Corrections follow SpellChecker's rules: known words are returned as is, and
+otherwise the most frequent word at the smallest edit distance (up to 2) wins.
+Distances are optimal string alignment, so the rare typo that needs a
+transposition of characters that were not adjacent to begin with (e.g.
+"iglke" -> "like") is one edit further away than SpellChecker considers it.
+
+Build a snapshot once so workers don't rebuild the index on start:
+
+    python spelling.py build data/spell_index.bin
+
+Snapshots are memory-mapped rather than deserialized: only the word list is
+decoded on load, and the delete table is probed in place, so loading takes
+milliseconds and every worker process shares the same pages.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import time
+from array import array
+
+
+def osa_distance(a, b, max_distance):
+    """Optimal string alignment distance between a and b, or max_distance + 1 if it is larger."""
+    if a == b:
+        return 0
+    # Common prefixes and suffixes never change the distance, so only align the middle
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+    if not len_a or not len_b:
+        return len_a or len_b
+    prev_prev = None
+    prev = list(range(len_b + 1))
+    for i in range(1, len_a + 1):
+        current = [i] + [0] * len_b
+        row_min = i
+        ca = a[i - 1]
+        for j in range(1, len_b + 1):
+            value = prev[j - 1] if ca == b[j - 1] else prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1] and prev_prev[j - 2] + 1 < value:
+                value = prev_prev[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return max_distance + 1
+        prev_prev, prev = prev, current
+    return prev[len_b] if prev[len_b] <= max_distance else max_distance + 1
+
+
+def _key_hash(key):
+    # Stable across processes (unlike hash()); 0 marks an empty slot, so it is never produced
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") | 1
+
+
+class MappedDeletes:
+    """Read-only delete -> candidate words table stored in a snapshot.
+
+    Open addressing over 64-bit hashes of the deletes. The deletes themselves
+    are not stored: a hash collision only adds candidates, and correction()
+    verifies every candidate's distance anyway.
+    """
+
+    def __init__(self, hashes, starts, lengths, postings, word_list):
+        self._hashes = hashes
+        self._starts = starts
+        self._lengths = lengths
+        self._postings = postings
+        self._word_list = word_list
+        self._mask = len(hashes) - 1
+
+    def __len__(self):
+        return sum(1 for h in self._hashes if h)
+
+    def get(self, key):
+        h = _key_hash(key)
+        slot = h & self._mask
+        while True:
+            stored = self._hashes[slot]
+            if stored == h:
+                start = self._starts[slot]
+                return list(map(self._word_list.__getitem__, self._postings[start:start + self._lengths[slot]]))
+            if not stored:
+                return None
+            slot = (slot + 1) & self._mask
+
+
+class SymSpell:
+    SNAPSHOT_MAGIC = b"SYMSPELL"
+    SNAPSHOT_VERSION = 2
+
+    def __init__(self, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words = {}
+        self.longest_word_length = 0
+        # delete -> word, or list of words when several share the same delete (a MappedDeletes once loaded)
+        self._deletes = {}
+
+    @classmethod
+    def from_frequencies(cls, frequencies, max_distance=2, prefix_length=7):
+        index = cls(max_distance, prefix_length)
+        for word, count in frequencies.items():
+            index.add(word, count)
+        return index
+
+    def add(self, word, count=1):
+        if word in self.words:
+            self.words[word] += count
+            return
+        self.words[word] = count
+        self.longest_word_length = max(self.longest_word_length, len(word))
+        prefix = word[:self.prefix_length]
+        for key in {prefix}.union(*self._deletes_by_level(prefix)):
+            bucket = self._deletes.get(key)
+            if bucket is None:
+                self._deletes[key] = word
+            elif isinstance(bucket, str):
+                self._deletes[key] = [bucket, word]
+            else:
+                bucket.append(word)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def _should_check(self, word):
+        # Same exclusions as SpellChecker: punctuation, numbers and overlong strings pass through
+        if len(word) > self.longest_word_length + 3:
+            return False
+        if len(word) == 1 and not word.isalpha():
+            return False
+        try:
+            float(word)
+            return word in ("nan", "inf", "infinity")
+        except ValueError:
+            return True
+
+    def correction(self, word):
+        """Best correction for a lowercase word, the word itself if known, or None if nothing is close."""
+        if word in self.words or not self._should_check(word):
+            return word
+        max_distance = self.max_distance
+        best, best_distance, best_count = None, max_distance + 1, 0
+        prefix_length = self.prefix_length
+        word_length = len(word)
+        prefix = word[:prefix_length]
+        checked = set()
+        # Visit the query's deletes in order of distance so we can stop early
+        for delete_distance, keys in enumerate([{prefix}] + self._deletes_by_level(prefix)):
+            if delete_distance > best_distance:
+                break
+            for key in keys:
+                bucket = self._deletes.get(key)
+                if bucket is None:
+                    continue
+                key_length = len(key)
+                for candidate in (bucket,) if isinstance(bucket, str) else bucket:
+                    # Deletes needed on the dictionary side are a lower bound on the distance too
+                    if min(len(candidate), prefix_length) - key_length > best_distance:
+                        continue
+                    if abs(len(candidate) - word_length) > best_distance or candidate in checked:
+                        continue
+                    checked.add(candidate)
+                    distance = osa_distance(word, candidate, best_distance)
+                    if distance > best_distance:
+                        continue
+                    count = self.words[candidate]
+                    if distance < best_distance or count > best_count:
+                        best, best_distance, best_count = candidate, distance, count
+        return best
+
+    def _deletes_by_level(self, word):
+        levels = []
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {item[:i] + item[i + 1:] for item in frontier if len(item) > 1 for i in range(len(item))}
+            levels.append(frontier)
+        return levels
+
+    def save(self, path):
+        """Write a memory-mappable snapshot (see load)."""
+        word_list = list(self.words)
+        ids = {word: i for i, word in enumerate(word_list)}
+        buckets = {}
+        for key, bucket in self._deletes.items():
+            buckets.setdefault(_key_hash(key), []).extend(ids[w] for w in ((bucket,) if isinstance(bucket, str) else bucket))
+        capacity = 1 << (2 * len(buckets) - 1).bit_length()  # Load factor <= 0.5 keeps probes short
+        mask = capacity - 1
+        hashes = array("Q", bytes(8 * capacity))
+        starts = array("I", bytes(4 * capacity))
+        lengths = array("I", bytes(4 * capacity))
+        postings = array("I")
+        for h, word_ids in buckets.items():
+            slot = h & mask
+            while hashes[slot]:
+                slot = (slot + 1) & mask
+            hashes[slot], starts[slot], lengths[slot] = h, len(postings), len(word_ids)
+            postings.extend(word_ids)
+        sections = [
+            ("words", "\n".join(word_list).encode("utf-8")),
+            ("counts", array("Q", self.words.values()).tobytes()),
+            ("hashes", hashes.tobytes()),
+            ("starts", starts.tobytes()),
+            ("lengths", lengths.tobytes()),
+            ("postings", postings.tobytes()),
+        ]
+        header = {
+            "version": self.SNAPSHOT_VERSION,
+            "byteorder": sys.byteorder,
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "longest_word_length": self.longest_word_length,
+            "sections": {},
+        }
+        # Section offsets depend on the header length, so size the header with placeholder offsets first
+        header_size = 4096
+        while True:
+            offset = _align(len(self.SNAPSHOT_MAGIC) + 4 + header_size)
+            for name, data in sections:
+                header["sections"][name] = [offset, len(data)]
+                offset = _align(offset + len(data))
+            encoded = json.dumps(header).encode("utf-8")
+            if len(encoded) <= header_size:
+                break
+            header_size *= 2
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # Per process, in case several build at once
+        with open(tmp_path, "wb") as f:
+            f.write(self.SNAPSHOT_MAGIC + header_size.to_bytes(4, "little") + encoded.ljust(header_size))
+            for name, data in sections:
+                f.seek(header["sections"][name][0])
+                f.write(data)
+        os.replace(tmp_path, path)  # Atomic swap so running workers never map a half-written file
+
+    @classmethod
+    def load(cls, path):
+        """Map a snapshot written by save(); the returned index is read-only."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic_length = len(cls.SNAPSHOT_MAGIC)
+        if mapped[:magic_length] != cls.SNAPSHOT_MAGIC:
+            raise ValueError("Not a spell index snapshot")
+        header_size = int.from_bytes(mapped[magic_length:magic_length + 4], "little")
+        header = json.loads(mapped[magic_length + 4:magic_length + 4 + header_size])
+        if header["version"] != cls.SNAPSHOT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Unsupported spell index snapshot version: {header['version']} ({header['byteorder']})")
+        view = memoryview(mapped)
+
+        def section(name, typecode=None):
+            offset, size = header["sections"][name]
+            data = view[offset:offset + size]
+            return data.cast(typecode) if typecode else data
+
+        word_list = str(section("words"), "utf-8").split("\n")
+        index = cls(header["max_distance"], header["prefix_length"])
+        index.words = dict(zip(word_list, section("counts", "Q").tolist()))
+        index.longest_word_length = header["longest_word_length"]
+        index._deletes = MappedDeletes(section("hashes", "Q"), section("starts", "I"), section("lengths", "I"),
+                                       section("postings", "I"), word_list)
+        return index
+
+    @classmethod
+    def load_or_build(cls, path, load_frequencies):
+        """Load the snapshot at path if there is one, otherwise build the index from load_frequencies().
+
+        A freshly built index is saved to path, so only the first start pays for the build.
+        """
+        start = time.perf_counter()
+        if path and os.path.exists(path):
+            try:
+                index = cls.load(path)
+                logging.info("Loaded spell index from %s in %.2fs", path, time.perf_counter() - start)
+                return index
+            except Exception as e:
+                logging.warning("Ignoring unreadable spell index %s: %s", path, e)
+        index = cls.from_frequencies(load_frequencies())
+        logging.info("Built spell index (%d words) in %.2fs", len(index.words), time.perf_counter() - start)
+        if not path:
+            return index
+        try:
+            index.save(path)
+            logging.info("Saved spell index snapshot to %s", path)
+            return cls.load(path)  # Mapped pages are shared by all workers instead of copied per process
+        except Exception as e:
+            logging.warning("Could not save spell index snapshot to %s: %s", path, e)
+            return index
+
+
+def _align(offset, to=8):
+    return (offset + to - 1) // to * to
+
+
+def main(argv):
+    if len(argv) != 3 or argv[1] != "build":
+        print("Usage: python spelling.py build <snapshot.bin>")
+        return 2
+    from spellchecker import SpellChecker
+    index = SymSpell.from_frequencies(SpellChecker().word_frequency.dictionary)
+    index.save(argv[2])
+    print(f"Saved spell index ({len(index.words)} words) to {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,220 @@
+// Fallback for no JS: Form works normally
+let searchHistory = JSON.parse(localStorage.getItem('searchHistory')) || [];
+const SUGGEST_LIMIT = 8;
+const SUGGEST_DEBOUNCE_MS = 150;
+const suggestionCache = new Map();  // prefix -> suggestions from /suggest
+let suggestTimer = null;
+let suggestController = null;
+
+// A cached shorter prefix with fewer than SUGGEST_LIMIT results already holds every completion,
+// so longer prefixes can be answered by filtering it locally.
+function cachedSuggestions(prefix) {
+    for (let length = prefix.length; length >= 1; length--) {
+        const cached = suggestionCache.get(prefix.slice(0, length));
+        if (cached && (length === prefix.length || cached.length < SUGGEST_LIMIT)) {
+            return cached.filter(word => word.startsWith(prefix));
+        }
+    }
+    return null;
+}
+
+async function fetchSuggestions(prefix) {
+    const cached = cachedSuggestions(prefix);
+    if (cached) return cached;
+    if (suggestController) suggestController.abort();  // Only the latest keystroke matters
+    suggestController = new AbortController();
+    const response = await fetch(`/suggest?q=${encodeURIComponent(prefix)}&k=${SUGGEST_LIMIT}`, { signal: suggestController.signal });
+    const data = await response.json();
+    suggestionCache.set(prefix, data.suggestions);
+    return data.suggestions;
+}
+
+function showSuggestions(input) {
+    const inputVal = input.trim().toLowerCase();
+    const suggestionsDiv = document.getElementById('suggestions');
+    clearTimeout(suggestTimer);
+    if (inputVal.length < 2) {
+        suggestionsDiv.innerHTML = '';
+        suggestionsDiv.style.display = 'none';
+        return;
+    }
+    const cached = cachedSuggestions(inputVal);
+    if (cached) {
+        renderSuggestions(cached);
+        return;
+    }
+    suggestTimer = setTimeout(async () => {
+        try {
+            const suggestions = await fetchSuggestions(inputVal);
+            if (searchInput.value.trim().toLowerCase() === inputVal) renderSuggestions(suggestions);
+        } catch (err) {
+            if (err.name !== 'AbortError') console.error('Suggest error:', err);
+        }
+    }, SUGGEST_DEBOUNCE_MS);
+}
+
+function renderSuggestions(filtered) {
+    const suggestionsDiv = document.getElementById('suggestions');
+    suggestionsDiv.innerHTML = '';
+    if (filtered.length > 0) {
+        filtered.forEach(word => {
+            const item = document.createElement('div');
+            item.className = 'suggestion-item';
+            item.textContent = word;
+            item.onclick = () => {
+                document.getElementById('searchInput').value = word;
+                suggestionsDiv.style.display = 'none';
+                document.getElementById('searchForm').requestSubmit();
+            };
+            suggestionsDiv.appendChild(item);
+        });
+        suggestionsDiv.style.display = 'block';
+    } else {
+        suggestionsDiv.style.display = 'none';
+    }
+}
+
+const searchInput = document.getElementById('searchInput');
+searchInput.addEventListener('input', (e) => showSuggestions(e.target.value));
+searchInput.addEventListener('focus', () => showSuggestions(searchInput.value));
+
+document.addEventListener('click', (e) => {
+    if (!e.target.closest('.search-form')) {
+        document.getElementById('suggestions').style.display = 'none';
+    }
+});
+
+function addToHistory(query) {
+    if (!searchHistory.includes(query)) {
+        searchHistory.unshift(query);
+        if (searchHistory.length > 5) searchHistory.pop();
+        localStorage.setItem('searchHistory', JSON.stringify(searchHistory));
+        updateHistory();
+    }
+}
+
+function updateHistory() {
+    const historyDiv = document.getElementById('history');
+    const historyList = document.getElementById('historyList');
+    historyList.innerHTML = '';
+    if (searchHistory.length > 0) {
+        historyDiv.style.display = 'block';
+        searchHistory.forEach(item => {
+            const li = document.createElement('li');
+            li.textContent = item;
+            li.style.cursor = 'pointer';
+            li.style.color = '#007bff';
+            li.onclick = () => {
+                searchInput.value = item;
+                document.getElementById('searchForm').submit();
+            };
+            historyList.appendChild(li);
+        });
+    }
+}
+
+// Render whatever parts of the answer have arrived so far, with the same priority as the JSON API:
+// formula, then recipe, then definitions; errors and "no results" only once the stream is done.
+function renderResult(result, data, query, done) {
+    let resultHtml = '';
+    let isError = false;
+    if (data.correction_message) {
+        resultHtml += `<div class="correction-note">${data.correction_message}</div>`;
+    }
+    if (data.formula_detected) {
+        resultHtml += `
+            <div class="formula-result">
+                <h3>Formula: ${data.original_word || query}</h3>
+                <div class="formula-render">$${data.formula_latex || query}$$</div>
+                <p><strong>Explanation:</strong> Mathematical expression rendered precisely.</p>
+            </div>
+        `;
+    } else if (data.recipe) {
+        resultHtml += `
+            <h3>Recipe: ${data.recipe.title}</h3>
+            ${data.recipe.ingredients ? `<strong>Ingredients:</strong><ul>${data.recipe.ingredients.map(ing => `<li>${ing}</li>`).join('')}</ul>` : ''}
+            <strong>Instructions:</strong><p>${data.recipe.instructions.replace(/\n/g, '<br>')}</p>
+        `;
+    } else if (data.definitions && data.definitions.length > 0) {
+        const displayWord = data.corrected_word || data.original_word || query;
+        resultHtml += `<strong>${displayWord}:</strong><ol>${data.definitions.map(d => `<li>${d}</li>`).join('')}</ol>`;
+    } else if (done && data.error) {
+        resultHtml += `<strong>Error:</strong> ${data.error}`;
+        isError = true;
+    } else if (done) {
+        resultHtml += 'No results found. Try a different query!';
+    }
+
+    result.innerHTML = resultHtml;
+    result.className = isError ? 'result error' : 'result';
+}
+
+// Intercept form for AJAX (if JS enabled). The server streams one JSON event per line
+// (query, then recipe / definitions as each upstream answers, then done).
+document.getElementById('searchForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+    const query = searchInput.value.trim();
+    if (!query) return;
+
+    addToHistory(query);
+    const loading = document.getElementById('loading');
+    let result = document.getElementById('result');
+    if (!result) {
+        result = createResultDiv();
+    }
+    const btn = document.getElementById('searchBtn');
+    loading.style.display = 'block';
+    result.innerHTML = '';
+    btn.disabled = true;
+
+    try {
+        const formData = new FormData();
+        formData.append('word', query);
+        const response = await fetch('/', {
+            method: 'POST',
+            headers: { 'Accept': 'application/x-ndjson' },
+            body: formData
+        });
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const data = {};
+        let buffered = '';
+        let done = false;
+        while (!done) {
+            const chunk = await reader.read();
+            buffered += decoder.decode(chunk.value || new Uint8Array(), { stream: !chunk.done });
+            const lines = buffered.split('\n');
+            buffered = chunk.done ? '' : lines.pop();
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const event = JSON.parse(line);
+                if (event.event === 'done') {
+                    done = true;
+                } else {
+                    Object.assign(data, event);
+                }
+            }
+            done = done || chunk.done;
+            renderResult(result, data, query, done);
+        }
+    } catch (err) {
+        result.innerHTML = '<strong>Error:</strong> Connection issue. Please refresh and try again.';
+        result.className = 'result error';
+        console.error('Search error:', err);
+    } finally {
+        loading.style.display = 'none';
+        btn.disabled = false;
+        document.getElementById('suggestions').style.display = 'none';
+    }
+});
+
+function createResultDiv() {
+    const div = document.createElement('div');
+    div.id = 'result';
+    div.className = 'result';
+    document.querySelector('.container').insertBefore(div, document.getElementById('history') || null);
+    return div;
+}
+
+// Init history
+updateHistory();
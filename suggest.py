@@ -0,0 +1,42 @@
+"""Prefix autocomplete over a word-frequency dictionary.
+
+Words are kept in one sorted list, so the completions of a prefix are the
+contiguous slice found with two bisects. Short prefixes match thousands of
+words, so their top completions are precomputed when the index is built;
+longer prefixes only match a handful of words and are ranked on the fly.
+"""
+import heapq
+from bisect import bisect_left
+
+
+class PrefixIndex:
+    """Top-k completions of a prefix, most frequent first."""
+
+    def __init__(self, frequencies, max_k=20, precomputed_length=3):
+        self.max_k = max_k
+        self.precomputed_length = precomputed_length
+        self._words = sorted(w for w in frequencies if w.isalpha())
+        self._counts = [frequencies[w] for w in self._words]
+        self._top = {}
+        for length in range(1, precomputed_length + 1):
+            prefixes = {w[:length] for w in self._words if len(w) >= length}
+            for prefix in prefixes:
+                self._top[prefix] = tuple(self._rank(prefix, max_k))
+
+    def __len__(self):
+        return len(self._words)
+
+    def _rank(self, prefix, k):
+        lo = bisect_left(self._words, prefix)
+        hi = bisect_left(self._words, prefix + "\uffff", lo)
+        ranked = heapq.nlargest(k, range(lo, hi), key=self._counts.__getitem__)
+        return [self._words[i] for i in ranked]
+
+    def complete(self, prefix, k=8):
+        """Return up to k words starting with prefix (lowercase), most frequent first."""
+        k = min(k, self.max_k)
+        if not prefix or k <= 0:
+            return []
+        if len(prefix) <= self.precomputed_length:
+            return list(self._top.get(prefix, ())[:k])
+        return self._rank(prefix, k)
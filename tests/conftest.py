@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of top-level modules run from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_upstreams import start_stub  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def stub():
+    """Local stand-in for both upstream APIs, shared by the whole session."""
+    server = start_stub(latency=0.0)
+    yield server
+    server.shutdown()
+
+
+# Every word the app tests look up, so none of them gets "corrected" into another word
+TEST_WORDS = ["apple", "pear", "pizza", "curry", "hello", "world", "receive", "circuit", "stream", "streams",
+              "streamed", "traced"]
+
+
+@pytest.fixture(scope="session")
+def app_module(stub, tmp_path_factory):
+    """The app module, configured (at import time) against the stub upstreams and a small spell index."""
+    from spelling import SymSpell
+
+    data = tmp_path_factory.mktemp("data")
+    spell_index_path = str(data / "spell_index.bin")
+    SymSpell.from_frequencies({word: 100 for word in TEST_WORDS}).save(spell_index_path)
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in {
+            "DICTIONARY_API_URL": stub.url,
+            "SPOONACULAR_API_URL": stub.url,
+            "SPOONACULAR_API_KEY": "test-key",
+            "SPELL_INDEX_PATH": spell_index_path,
+            "RECIPE_STORE_PATH": str(data / "recipes.db"),
+            "LOCAL_DICTIONARY_PATH": "",
+            "UPSTREAM_RETRIES": "0",
+            "LOG_LEVEL": "WARNING",
+        }.items():
+            patch.setenv(name, value)
+        import app
+        yield app
+
+
+@pytest.fixture
+def client(app_module, stub):
+    stub.error_rate = 0.0
+    app_module.definition_cache.local.clear()
+    app_module.lookup_cache.local.clear()
+    for upstream in (app_module.dictionary_client, app_module.recipe_client):
+        upstream.breaker.record_success()
+    return app_module.app.test_client()
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+import admission
+from admission import (AdmissionStore, ClientRateLimiter, LocalStore, RateLimited, UpstreamBusy, UpstreamLimiter,
+                       make_store)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+class BrokenStore(AdmissionStore):
+    def take_tokens(self, key, rate, burst, cost=1):
+        raise ConnectionError("store down")
+
+    def acquire_slot(self, key, limit, lease):
+        raise ConnectionError("store down")
+
+    def release_slot(self, key, token):
+        raise ConnectionError("store down")
+
+
+def test_client_limiter_allows_bursts_then_limits(clock):
+    limiter = ClientRateLimiter(LocalStore(), rate=1, burst=2)
+    limiter.check("1.2.3.4")
+    limiter.check("1.2.3.4")
+    with pytest.raises(RateLimited) as excinfo:
+        limiter.check("1.2.3.4")
+    assert excinfo.value.status == 429
+    assert excinfo.value.retry_after == pytest.approx(1.0)
+    limiter.check("5.6.7.8")  # Other clients have their own bucket
+    clock[0] += 1
+    limiter.check("1.2.3.4")
+    assert limiter.limited == 1
+
+
+def test_client_limiter_charges_batches_by_cost(clock):
+    limiter = ClientRateLimiter(LocalStore(), rate=1, burst=10)
+    limiter.check("client", cost=10)
+    with pytest.raises(RateLimited):
+        limiter.check("client")
+
+
+def test_client_limiter_off_and_store_errors_admit():
+    ClientRateLimiter(BrokenStore(), rate=0, burst=1).check("client")
+    limiter = ClientRateLimiter(BrokenStore(), rate=1, burst=1)
+    limiter.check("client")
+    assert limiter.store_errors == 1
+
+
+def test_local_store_sweeps_refilled_buckets(clock):
+    store = LocalStore(sweep_interval=10)
+    for client in range(100):
+        store.take_tokens(f"client:{client}", rate=1, burst=5)
+    store.take_tokens("client:busy", rate=1, burst=50, cost=50)
+    clock[0] += 4  # The first 100 refilled after 1s, client:busy needs 50s
+    store.take_tokens("client:busy", rate=1, burst=50)
+    assert len(store._buckets) == 101  # Not swept yet
+    clock[0] += 6
+    store.take_tokens("client:new", rate=1, burst=5)
+    assert set(store._buckets) == {"client:busy", "client:new"}
+
+
+def test_local_store_slot_leases_expire(clock):
+    store = LocalStore()
+    assert store.acquire_slot("upstream:x", limit=1, lease=30)
+    assert store.acquire_slot("upstream:x", limit=1, lease=30) is None
+    clock[0] += 30
+    assert store.acquire_slot("upstream:x", limit=1, lease=30)
+
+
+def test_upstream_limiter_times_out_queued_calls():
+    limiter = UpstreamLimiter(LocalStore(), "dictionary", max_concurrency=1, max_waiting=1, queue_timeout=0.05)
+    with limiter.slot():
+        start = time.monotonic()
+        with pytest.raises(UpstreamBusy) as excinfo:
+            with limiter.slot():
+                pass
+        assert time.monotonic() - start >= 0.05
+    assert excinfo.value.status == 503
+    assert limiter.stats() == {"max_concurrency": 1, "waiting": 0, "shed": 1, "store_errors": 0}
+    with limiter.slot():  # Released slots are reusable
+        pass
+
+
+def test_upstream_limiter_sheds_when_queue_is_full_and_hands_over_released_slots():
+    limiter = UpstreamLimiter(LocalStore(), "dictionary", max_concurrency=1, max_waiting=1, queue_timeout=5)
+    waiter_result = []
+
+    def waiter():
+        with limiter.slot():
+            waiter_result.append("ran")
+
+    with limiter.slot():
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        while limiter.waiting < 1:
+            time.sleep(0.001)
+        start = time.monotonic()
+        with pytest.raises(UpstreamBusy):
+            with limiter.slot():
+                pass
+        assert time.monotonic() - start < 0.5  # Shed at once, not after the queue timeout
+    thread.join(5)
+    assert waiter_result == ["ran"]
+    assert limiter.shed == 1
+
+
+def test_upstream_limiter_rate_limit(clock):
+    limiter = UpstreamLimiter(LocalStore(), "spoonacular", max_concurrency=0, rate=0.5, burst=1)
+    with limiter.slot():
+        pass
+    with pytest.raises(UpstreamBusy) as excinfo:
+        with limiter.slot():
+            pass
+    assert excinfo.value.retry_after == pytest.approx(2.0)
+
+
+def test_upstream_limiter_admits_on_store_errors():
+    limiter = UpstreamLimiter(BrokenStore(), "dictionary", max_concurrency=1)
+    with limiter.slot():
+        pass
+    assert limiter.store_errors == 1
+
+
+def test_admission_store_must_implement_interface():
+    class Incomplete(AdmissionStore):
+        def take_tokens(self, key, rate, burst, cost=1):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_make_store():
+    assert isinstance(make_store(None), LocalStore)
+    assert isinstance(make_store("local://"), LocalStore)
+    with pytest.raises(ValueError):
+        make_store("memcached://localhost")
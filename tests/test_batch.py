@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+
+def batch_lines(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_results_in_input_order(client):
+    response = client.post("/batch", json={"queries": ["apple", "x^2", "", "Apple"]})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = batch_lines(response)
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert lines[0]["result"]["recipe"]["title"] == "Stub apple recipe"
+    assert lines[1]["result"]["formula_detected"] is True
+    assert lines[2]["result"] == {"error": "No query provided."}
+    assert lines[3]["result"]["original_word"] == "Apple"  # Looked up once, answered with its own spelling
+    assert lines[3]["result"]["recipe"] == lines[0]["result"]["recipe"]
+
+
+def test_batch_returns_definitions_for_words(client):
+    lines = batch_lines(client.post("/batch", json={"queries": ["hello"]}))
+    assert lines[0]["result"]["definitions"] == ["noun: Stub definition of hello."]
+
+
+@pytest.mark.parametrize("body", [
+    ["apple", "pear"],
+    "apple",
+    42,
+    None,
+    {"queries": "apple"},
+    {"queries": ["apple", 1]},
+])
+def test_batch_rejects_malformed_bodies(client, body):
+    response = client.post("/batch", json=body)
+    assert response.status_code == 400
+    assert "queries" in response.get_json()["error"]
+
+
+def test_batch_rejects_invalid_json(client):
+    response = client.post("/batch", data="{not json", content_type="application/json")
+    assert response.status_code == 400
+
+
+def test_batch_limits_query_count(client, app_module):
+    response = client.post("/batch", json={"queries": ["a"] * (app_module.BATCH_MAX_QUERIES + 1)})
+    assert response.status_code == 400
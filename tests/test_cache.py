@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+import cache
+from cache import LRUCache, SharedBackend, TieredCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+class DictBackend(SharedBackend):
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+
+
+class BrokenBackend(SharedBackend):
+    def get(self, key):
+        raise ConnectionError("down")
+
+    def set(self, key, value, ttl):
+        raise ConnectionError("down")
+
+
+def test_lru_entry_expires_after_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=60)
+    lru.set("apple", ["a fruit"])
+    clock.now += 59
+    assert lru.get("apple") == ["a fruit"]
+    clock.now += 1
+    assert lru.get("apple") is None
+    assert lru.stats()["expirations"] == 1
+
+
+def test_lru_per_entry_ttl_for_negative_results(clock):
+    lru = LRUCache(maxsize=10, ttl=3600)
+    lru.set("found", ["definition"])
+    lru.set("missing", ["Word not found in dictionary."], ttl=900)
+    clock.now += 900
+    assert lru.get("missing") is None
+    assert lru.get("found") == ["definition"]
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")  # b is now the least recently used
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats()["evictions"] == 1
+
+
+def test_tiered_cache_fills_local_from_shared():
+    shared = DictBackend()
+    TieredCache(LRUCache(ttl=60), shared=shared, namespace="def").set("apple", ["a fruit"])
+    other_worker = TieredCache(LRUCache(ttl=60), shared=shared, namespace="def")
+    assert other_worker.get("apple") == ["a fruit"]
+    assert other_worker.shared_hits == 1
+    assert other_worker.get("apple") == ["a fruit"]
+    assert other_worker.shared_hits == 1  # Second read came from the local LRU
+
+
+def test_tiered_cache_ignores_expired_shared_entries(monkeypatch):
+    shared = DictBackend()
+    TieredCache(LRUCache(ttl=60), shared=shared).set("apple", ["a fruit"], ttl=10)
+    now = time.time()
+    monkeypatch.setattr(cache.time, "time", lambda: now + 11)
+    assert TieredCache(LRUCache(ttl=60), shared=shared).get("apple") is None
+
+
+def test_tiered_cache_shared_errors_are_misses():
+    tiered = TieredCache(LRUCache(ttl=60), shared=BrokenBackend())
+    tiered.set("apple", ["a fruit"])  # Still cached locally
+    assert tiered.get("apple") == ["a fruit"]
+    assert tiered.get("pear", "default") == "default"
+    assert tiered.shared_errors == 2
+
+
+def test_shared_backend_must_implement_interface():
+    class Incomplete(SharedBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,71 @@
+import json
+import re
+
+import pytest
+
+from classifier import FOOD, FORMULA, WORD, QueryClassifier, trie_pattern
+
+FORMULA_KEYWORDS = {"formula", "equation", "integral", "sum"}
+FOOD_KEYWORDS = {"pizza", "cake", "cheesecake", "pasta", "pastry", "summer pudding"}
+
+
+@pytest.fixture
+def classifier():
+    return QueryClassifier(FORMULA_KEYWORDS, FOOD_KEYWORDS)
+
+
+def test_trie_pattern_matches_exactly_the_keywords():
+    words = ["pasta", "pastry", "past", "cake", "c++"]
+    pattern = re.compile(trie_pattern(words))
+    assert all(pattern.fullmatch(word) for word in words)
+    assert not any(pattern.fullmatch(word) for word in ["pas", "pastas", "cak", "c+", "cakes"])
+    assert trie_pattern(["pasta", "pastry"]) == "past(?:a|ry)"
+    assert trie_pattern([]) is None
+    assert trie_pattern([""]) is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("pizza", FOOD),
+    ("hello", WORD),
+    ("x^2 + y^2", FORMULA),
+    ("quadratic equation", FORMULA),
+    ("pizza formula", FORMULA),  # Formula wins wherever it appears
+    ("formula for pizza", FORMULA),
+    ("cake = 3", FORMULA),
+    ("summer pudding", FORMULA),  # Contains the formula keyword "sum"
+    ("cheesecake", FOOD),  # Overlapping food keywords
+    ("puff pastry", FOOD),
+    ("", WORD),
+])
+def test_classify(classifier, query, expected):
+    assert classifier.classify(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [("PIZZA", FOOD), ("Integral", FORMULA), ("CheeseCake", FOOD), ("HELLO", WORD)])
+def test_classify_ignores_case(classifier, query, expected):
+    assert classifier.classify(query) == expected
+
+
+@pytest.mark.parametrize("query", ["pizza", "hello", "x^2", "PIZZA", "Integral of cake", "summer", "pastry", "a-b", "cake sum"])
+def test_classify_agrees_with_separate_checks(classifier, query):
+    expected = FORMULA if classifier.is_formula(query) else FOOD if classifier.is_food(query) else WORD
+    assert classifier.classify(query) == expected
+
+
+def test_empty_keyword_sets():
+    classifier = QueryClassifier(set(), set())
+    assert classifier.classify("pizza") == WORD
+    assert not classifier.is_food("pizza")
+    assert classifier.classify("x^2") == FORMULA  # Math symbols still count
+    assert not classifier.is_formula("integral")
+
+
+def test_from_file_falls_back_to_defaults_for_missing_sets(tmp_path):
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps({"food": ["Ramen"]}), encoding="utf-8")
+    classifier = QueryClassifier.from_file(str(path), FORMULA_KEYWORDS, FOOD_KEYWORDS)
+    assert classifier.food_keywords == {"ramen"}
+    assert classifier.formula_keywords == FORMULA_KEYWORDS
+    assert classifier.classify("ramen") == FOOD
+    assert classifier.classify("pizza") == WORD
+    assert classifier.classify("integral") == FORMULA
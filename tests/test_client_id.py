@@ -0,0 +1,28 @@
+import pytest
+
+from admission import ClientRateLimiter, LocalStore
+
+
+@pytest.mark.parametrize("hops, forwarded, expected", [
+    (0, "1.1.1.1", "127.0.0.1"),  # Not behind a trusted proxy: the header is ignored
+    (1, None, "127.0.0.1"),
+    (1, "1.1.1.1", "1.1.1.1"),
+    (1, "10.0.0.1, 1.1.1.1", "1.1.1.1"),  # Client-supplied prefix is ignored
+    (2, "10.0.0.1, 1.1.1.1, 172.16.0.1", "1.1.1.1"),
+    (2, "1.1.1.1", "127.0.0.1"),  # Fewer entries than trusted proxies: not from the proxies
+])
+def test_client_id(app_module, monkeypatch, hops, forwarded, expected):
+    monkeypatch.setattr(app_module, "TRUST_FORWARDED_FOR", hops)
+    headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+    with app_module.app.test_request_context("/lookup", headers=headers, environ_base={"REMOTE_ADDR": "127.0.0.1"}):
+        assert app_module.client_id() == expected
+
+
+def test_spoofed_forwarded_prefix_does_not_escape_the_rate_limit(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "TRUST_FORWARDED_FOR", 1)
+    monkeypatch.setattr(app_module, "client_limiter", ClientRateLimiter(LocalStore(), rate=1, burst=1))
+    statuses = [client.get("/lookup", query_string={"q": "hello"},
+                           headers={"X-Forwarded-For": f"10.0.0.{i}, 1.1.1.1"}).status_code for i in range(3)]
+    assert statuses == [200, 429, 429]
+    other_client = client.get("/lookup", query_string={"q": "hello"}, headers={"X-Forwarded-For": "2.2.2.2"})
+    assert other_client.status_code == 200
@@ -0,0 +1,122 @@
+import gzip
+import json
+
+import pytest
+from flask import Response
+
+from compression import accepted_encodings, choose_encoding, compress_response, precompress, strip_etag_suffixes
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip; q=0.0, deflate", None),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("gzip;q=0, *", "br"),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("gzip;q=oops", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, BOTH) == expected
+
+
+def test_choose_encoding_only_offers_available_encodings():
+    assert choose_encoding("br", ("gzip",)) is None
+    assert choose_encoding("br, gzip;q=0.1", ("gzip",)) == "gzip"
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0}
+
+
+def test_strip_etag_suffixes():
+    environ = {"HTTP_IF_NONE_MATCH": '"abc-gzip", "def"'}
+    assert strip_etag_suffixes(environ) == "gzip"
+    assert environ["HTTP_IF_NONE_MATCH"] == '"abc", "def"'
+    plain = {"HTTP_IF_NONE_MATCH": '"my-tag"'}
+    assert strip_etag_suffixes(plain) is None
+    assert plain["HTTP_IF_NONE_MATCH"] == '"my-tag"'
+    assert strip_etag_suffixes({}) is None
+
+
+def json_response(size):
+    return Response(json.dumps({"data": "x" * size}), mimetype="application/json")
+
+
+def test_compress_response_respects_the_minimum_size():
+    small = compress_response(json_response(100), "gzip", min_size=512)
+    assert "Content-Encoding" not in small.headers
+    assert small.headers["Vary"] == "Accept-Encoding"  # Would be compressed for a bigger body
+    response = json_response(1000)
+    response.set_etag("tag")
+    big = compress_response(response, "gzip", min_size=512)
+    assert big.headers["Content-Encoding"] == "gzip"
+    assert big.get_etag() == ("tag-gzip", False)
+    assert json.loads(gzip.decompress(big.get_data()))["data"] == "x" * 1000
+
+
+def test_compress_response_skips_what_it_should_not_touch():
+    identity = compress_response(json_response(1000), "gzip;q=0", min_size=0)
+    assert "Content-Encoding" not in identity.headers
+    image = compress_response(Response(b"\x89PNG" * 500, mimetype="image/png"), "gzip", min_size=0)
+    assert "Content-Encoding" not in image.headers and "Vary" not in image.headers
+    streamed = compress_response(Response(iter(["a" * 1000]), mimetype="application/json"), "gzip", min_size=0)
+    assert "Content-Encoding" not in streamed.headers
+    empty = Response(status=204, mimetype="application/json")
+    assert "Content-Encoding" not in compress_response(empty, "gzip", min_size=0).headers
+
+
+def test_precompress():
+    bodies = precompress(b"hello " * 100)
+    assert bodies["identity"] == b"hello " * 100
+    assert gzip.decompress(bodies["gzip"]) == bodies["identity"]
+
+
+def test_page_is_served_precompressed(client):
+    plain = client.get("/")
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert plain.headers["Vary"] == compressed.headers["Vary"] == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("path", ["/", "/lookup?q=hello"])
+def test_revalidation_with_either_etag(client, app_module, monkeypatch, path):
+    monkeypatch.setattr(app_module, "COMPRESS_MIN_SIZE", 0)  # Compress the short /lookup body too
+    plain_etag = client.get(path).headers["ETag"]
+    gzip_etag = client.get(path, headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+    assert gzip_etag == plain_etag[:-1] + '-gzip"'
+    for etag in (plain_etag, gzip_etag):
+        response = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag  # The 304 names the representation the client holds
+    changed = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": '"stale-gzip"'})
+    assert changed.status_code == 200
+
+
+def test_assets_are_served_precompressed(client, app_module):
+    name = app_module.assets.hashed_name("app.js")
+    response = client.get(f"/assets/{name}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.get_data()) == client.get(f"/assets/{name}").get_data()
+
+
+def test_streamed_ndjson_is_not_compressed(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "COMPRESS_MIN_SIZE", 0)
+    with client.post("/", data={"word": "hello"},
+                     headers={"Accept": "application/x-ndjson", "Accept-Encoding": "gzip"}) as response:
+        lines = response.get_data(as_text=True).splitlines()
+    assert "Content-Encoding" not in response.headers
+    assert json.loads(lines[-1]) == {"event": "done"}
+    batch = client.post("/batch", json={"queries": ["hello"]}, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in batch.headers
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from local_dictionary import LocalDictionary, build_index, iter_dump
+
+
+def entry(word, *definitions):
+    return {"word": word, "meanings": [{"partOfSpeech": "noun", "definitions": [{"definition": d} for d in definitions]}]}
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def write_lines(path, records):
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_json_list_of_entries(tmp_path):
+    dump = write_json(tmp_path / "dump.json", [entry("Apple", "A fruit."), entry("pear", "Another fruit.")])
+    assert list(iter_dump(dump)) == [("apple", ["noun: A fruit."]), ("pear", ["noun: Another fruit."])]
+
+
+def test_json_list_of_api_responses(tmp_path):
+    dump = write_json(tmp_path / "dump.json", [[entry("apple", "A fruit."), entry("apple", "A company.")], []])
+    assert list(iter_dump(dump)) == [("apple", ["noun: A fruit."])]
+
+
+def test_json_mapping(tmp_path):
+    dump = write_json(tmp_path / "dump.json", {"apple": ["noun: A fruit."], "pear": [entry("pear", "A fruit.")], "none": []})
+    assert list(iter_dump(dump)) == [("apple", ["noun: A fruit."]), ("pear", ["noun: A fruit."])]
+
+
+@pytest.mark.parametrize("name", ["dump.jsonl", "dump.json"])
+def test_json_lines_whatever_the_extension(tmp_path, name):
+    dump = write_lines(tmp_path / name, [entry("apple", "A fruit."), [entry("pear", "A fruit.")]])
+    assert list(iter_dump(dump)) == [("apple", ["noun: A fruit."]), ("pear", ["noun: A fruit."])]
+
+
+def test_build_and_lookup(tmp_path):
+    dump = write_lines(tmp_path / "dump.jsonl", [entry("apple", "A fruit."), entry("Apple", "Duplicate."), entry("pear", "A fruit.")])
+    index = str(tmp_path / "data" / "dictionary.db")
+    assert build_index(dump, index) == 2
+    dictionary = LocalDictionary.open(index)
+    assert dictionary.lookup(" APPLE ") == ["noun: A fruit."]  # First entry wins
+    assert dictionary.lookup("plum") is None
+    assert (dictionary.hits, dictionary.misses) == (1, 1)
+    assert sorted(p.name for p in (tmp_path / "data").iterdir()) == ["dictionary.db"]
+
+
+def test_failed_build_leaves_no_temp_file(tmp_path):
+    dump = write_lines(tmp_path / "dump.jsonl", [entry("apple", "A fruit.")])
+    with open(dump, "a", encoding="utf-8") as f:
+        f.write("{not json\n")
+    index = tmp_path / "dictionary.db"
+    with pytest.raises(json.JSONDecodeError):
+        build_index(dump, str(index))
+    assert not index.exists()
+    assert not (tmp_path / "dictionary.db.tmp").exists()
+
+
+def test_open_without_index(tmp_path):
+    assert LocalDictionary.open(str(tmp_path / "missing.db")) is None
+    assert LocalDictionary.open("") is None
@@ -0,0 +1,57 @@
+def lookup(client, query, **headers):
+    return client.get("/lookup", query_string={"q": query}, headers=headers)
+
+
+def test_lookup_is_cacheable_and_revalidates(client):
+    response = lookup(client, "  Hello ")
+    assert response.status_code == 200
+    assert response.get_json()["definitions"] == ["noun: Stub definition of hello."]
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+    etag = response.headers["ETag"]
+    again = lookup(client, "hello", **{"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+
+def test_lookup_not_found_gets_the_negative_ttl(client):
+    response = lookup(client, "zzzq")
+    assert response.get_json()["definitions"] == ["Word not found in dictionary."]
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+
+
+def test_lookup_requires_a_query(client):
+    assert lookup(client, " ").status_code == 400
+
+
+def test_dictionary_errors_are_not_cached(client, app_module, stub, monkeypatch):
+    monkeypatch.setattr(stub, "error_rate", 1.0)
+    response = lookup(client, "world")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert app_module.lookup_cache.get("world") is None
+    monkeypatch.setattr(stub, "error_rate", 0.0)
+    response = lookup(client, "world")
+    assert response.get_json()["definitions"] == ["noun: Stub definition of world."]
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+
+def test_open_circuit_is_not_cached(client, app_module):
+    breaker = app_module.dictionary_client.breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    response = lookup(client, "circuit")
+    assert response.get_json()["definitions"] == ["Unable to fetch definition at this time."]
+    assert response.headers["Cache-Control"] == "no-store"
+    assert app_module.lookup_cache.get("circuit") is None
+
+
+def test_recipe_failure_fallback_is_not_cached(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module.recipe_client, "base_url", "http://127.0.0.1:9")  # Nothing listens here
+    response = lookup(client, "curry")
+    assert response.get_json()["definitions"] == ["noun: Stub definition of curry."]
+    assert response.headers["Cache-Control"] == "no-store"
+    monkeypatch.undo()
+    app_module.recipe_client.breaker.record_success()
+    response = lookup(client, "curry")
+    assert response.get_json()["recipe"]["title"] == "Stub curry recipe"
+    assert response.headers["Cache-Control"] == "public, max-age=3600"
@@ -0,0 +1,77 @@
+import pytest
+
+import recipe_store
+from recipe_store import Recipe, RecipeStore, normalize_query
+
+RESULT = {
+    "title": "Tomato Soup",
+    "extendedIngredients": [{"original": "  2 cups   tomatoes "}, {"original": ""}, {"original": "1 onion"}],
+    "instructions": "Chop.\nSimmer.",
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RecipeStore(str(tmp_path / "recipes.db"), negative_ttl=60)
+
+
+def test_from_result_trims_the_result():
+    recipe = Recipe.from_result(RESULT, "soup")
+    assert recipe == Recipe("Tomato Soup", ("2 cups tomatoes", "1 onion"), "Chop. Simmer.")
+    assert recipe.as_dict() == {"title": "Tomato Soup", "ingredients": ["2 cups tomatoes", "1 onion"],
+                                "instructions": "Chop. Simmer."}
+
+
+def test_from_result_handles_null_fields():
+    recipe = Recipe.from_result({"title": None, "instructions": None, "extendedIngredients": None}, "tomato soup")
+    assert recipe == Recipe("Tomato Soup Recipe", (), "No instructions available.")
+
+
+def test_round_trip_through_sqlite(store, tmp_path):
+    recipe = Recipe.from_result(RESULT, "soup")
+    store.put("  Tomato   SOUP ", recipe)
+    other_worker = RecipeStore(str(tmp_path / "recipes.db"))  # Empty in-process LRU, reads the file
+    assert other_worker.get("tomato soup") == recipe
+    assert "TOMATO SOUP" in other_worker
+    assert other_worker.get("pea soup", "default") == "default"
+    assert (other_worker.hits, other_worker.misses) == (2, 1)
+
+
+def test_negative_results_expire(store, tmp_path, monkeypatch):
+    store.put("unobtainium pie", None)
+    assert store.get("unobtainium pie", "default") is None
+    now = recipe_store.time.time()
+    monkeypatch.setattr(recipe_store.time, "time", lambda: now + 61)
+    other_worker = RecipeStore(str(tmp_path / "recipes.db"), negative_ttl=60)
+    assert other_worker.get("unobtainium pie", "default") == "default"
+
+
+def test_open_disabled_or_unwritable(tmp_path):
+    assert RecipeStore.open("") is None
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert RecipeStore.open(str(blocker / "recipes.db")) is None
+
+
+def test_normalize_query():
+    assert normalize_query("  Chicken\tCURRY ") == "chicken curry"
+
+
+def test_upstream_errors_are_never_stored(client, app_module, stub, monkeypatch):
+    monkeypatch.setattr(stub, "error_rate", 1.0)
+    assert "error" in app_module.get_food_recipe("chicken soup")
+    assert "chicken soup" not in app_module.recipe_store
+    monkeypatch.setattr(stub, "error_rate", 0.0)
+    assert app_module.get_food_recipe("Chicken  Soup")["title"] == "Stub chicken soup recipe"
+    assert "chicken soup" in app_module.recipe_store
+
+
+def test_prewarm_recipes_skips_stored_keywords(client, app_module, stub):
+    runner = app_module.app.test_cli_runner()
+    result = runner.invoke(args=["prewarm-recipes"])
+    assert result.exit_code == 0, result.output
+    assert all(keyword in app_module.recipe_store for keyword in app_module.query_classifier.food_keywords)
+    requests_before = stub.requests
+    result = runner.invoke(args=["prewarm-recipes"])
+    assert "Stored 0 recipes (0 failed)" in result.output
+    assert stub.requests == requests_before
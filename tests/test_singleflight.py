@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def run_concurrently(flight, fn, callers=5):
+    """Start callers calls of flight.do("key", fn) while fn is blocked; return their futures."""
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def blocked():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=callers)
+    futures = [pool.submit(flight.do, "key", blocked)]
+    started.wait(5)
+    futures += [pool.submit(flight.do, "key", blocked) for _ in range(callers - 1)]
+    while flight.coalesced < callers - 1:  # Everyone else is waiting on the leader
+        time.sleep(0.001)
+    release.set()
+    pool.shutdown(wait=True)
+    return futures, calls
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    futures, calls = run_concurrently(flight, lambda: ["shared"])
+    assert len(calls) == 1
+    results = [future.result() for future in futures]
+    assert results == [["shared"]] * 5
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_concurrent_calls_share_the_exception():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("upstream down")
+
+    futures, calls = run_concurrently(flight, fail)
+    assert len(calls) == 1
+    for future in futures:
+        with pytest.raises(ValueError, match="upstream down"):
+            future.result()
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_sequential_calls_run_again():
+    flight = SingleFlight()
+    calls = []
+    for _ in range(3):
+        flight.do("key", calls.append, 1)
+    assert len(calls) == 3
+    assert flight.stats() == {"in_flight": 0, "leaders": 3, "coalesced": 0}
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", str.upper, "a") == "A"
+    assert flight.do("b", str.upper, "b") == "B"
+    assert flight.leaders == 2
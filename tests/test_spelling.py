@@ -0,0 +1,44 @@
+import os
+
+from spelling import SymSpell
+
+FREQUENCIES = {"receive": 500, "recipe": 300, "hello": 800, "help": 900, "world": 700}
+
+
+def test_correction():
+    index = SymSpell.from_frequencies(FREQUENCIES)
+    assert index.correction("recieve") == "receive"
+    assert index.correction("wrold") == "world"
+    assert "hello" in index
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "index.bin")
+    SymSpell.from_frequencies(FREQUENCIES).save(path)
+    index = SymSpell.load(path)
+    assert index.correction("recieve") == "receive"
+    assert index.words["hello"] == 800
+
+
+def test_load_or_build_saves_the_built_index(tmp_path):
+    path = str(tmp_path / "data" / "index.bin")
+    calls = []
+
+    def load_frequencies():
+        calls.append(1)
+        return FREQUENCIES
+
+    built = SymSpell.load_or_build(path, load_frequencies)
+    assert os.path.exists(path)
+    assert built.correction("recieve") == "receive"
+    loaded = SymSpell.load_or_build(path, load_frequencies)
+    assert len(calls) == 1  # The second start mapped the snapshot instead of rebuilding
+    assert loaded.correction("recieve") == "receive"
+    assert [name for name in os.listdir(tmp_path / "data")] == ["index.bin"]  # No temporary files left
+
+
+def test_load_or_build_still_works_when_the_snapshot_cannot_be_written(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    index = SymSpell.load_or_build(str(blocker / "index.bin"), lambda: FREQUENCIES)
+    assert index.correction("recieve") == "receive"
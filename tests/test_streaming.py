@@ -0,0 +1,41 @@
+import json
+import logging
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def request_seconds(app_module, endpoint):
+    """(sum, count) of the request duration histogram for one endpoint's 200s."""
+    series = app_module.REQUEST_SECONDS._series.get((endpoint, "POST", "200"))
+    return (series[-2], series[-1]) if series else (0.0, 0)
+
+
+def stream(client, word):
+    with client.post("/", data={"word": word}, headers=NDJSON) as response:
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_events(client):
+    events = stream(client, "recieve")
+    assert [event["event"] for event in events] == ["query", "definitions", "done"]
+    assert events[0]["corrected_word"] == "receive"
+    assert events[1]["definitions"] == ["noun: Stub definition of receive."]
+
+
+def test_streamed_request_time_covers_the_whole_stream(client, app_module, stub, monkeypatch):
+    monkeypatch.setattr(stub, "latency", 0.05)
+    before_sum, before_count = request_seconds(app_module, "home_post")
+    for word in ("stream", "streams", "streamed"):
+        stream(client, word)
+    after_sum, after_count = request_seconds(app_module, "home_post")
+    assert after_count - before_count == 3
+    assert after_sum - before_sum >= 3 * 0.05
+
+
+def test_sampled_trace_of_a_stream_includes_upstream_spans(client, app_module, monkeypatch, caplog):
+    monkeypatch.setattr(app_module, "TRACE_SAMPLE_RATE", 1.0)
+    caplog.set_level(logging.INFO)
+    stream(client, "traced")
+    traces = [record.getMessage() for record in caplog.records if record.getMessage().startswith("trace POST /")]
+    assert len(traces) == 1
+    assert "definitions=" in traces[0] and "total=" in traces[0]
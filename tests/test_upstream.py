@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+import upstream
+from upstream import CircuitBreaker, CircuitOpenError, UpstreamClient
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(upstream.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # Resets the count
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_trial_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_half_open_trial_reopens_on_failure(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()  # A single failure is enough while half-open
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_client_returns_response_and_closes_breaker(stub):
+    client = UpstreamClient("dictionary", stub.url, retries=0)
+    response = client.get("/api/v2/entries/en/apple")
+    assert response.status_code == 200
+    assert response.json()[0]["word"] == "apple"
+    assert client.get("/api/v2/entries/en/zzz").status_code == 404  # Answers, even 404s, are successes
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_retries_server_errors_then_opens_circuit(stub, monkeypatch):
+    monkeypatch.setattr(stub, "error_rate", 1.0)
+    stub.requests = 0
+    client = UpstreamClient("dictionary", stub.url, retries=1, backoff=0.0,
+                            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    assert client.get("/api/v2/entries/en/apple").status_code == 503
+    assert stub.requests == 2
+    with pytest.raises(CircuitOpenError):
+        client.get("/api/v2/entries/en/apple")
+    assert stub.requests == 2  # Rejected without touching the network
+
+
+def test_unexpected_error_on_half_open_trial_reopens_circuit(stub, clock, monkeypatch):
+    client = UpstreamClient("dictionary", stub.url, retries=0,
+                            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30))
+    client.breaker.record_failure()
+    clock[0] += 30
+
+    def broken_get(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(client.session, "get", broken_get)
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.get("/api/v2/entries/en/apple")
+    assert client.breaker.state == CircuitBreaker.OPEN
+    clock[0] += 30
+    assert client.get("/api/v2/entries/en/apple").status_code == 200
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,135 @@
+"""Pooled HTTP clients for the upstream APIs (Spoonacular, dictionaryapi.dev).
+
+One keep-alive session per upstream host, tight connect/read timeouts,
+jittered retries for GETs and a circuit breaker that fails fast while an
+upstream is down. Base URLs are configurable so everything can be pointed
+at a local stub server.
+"""
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and stays open for
+    `reset_timeout` seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class UpstreamClient:
+    def __init__(self, name, base_url, pool_size=10, connect_timeout=1.0, read_timeout=3.0,
+                 retries=1, backoff=0.1, breaker=None, observer=None, limiter=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        # Called as observer(name, status, seconds) for every attempt; status is the HTTP
+        # status code, "error" or "circuit_open"
+        self.observer = observer
+        # Optional admission.UpstreamLimiter capping concurrent calls across workers
+        self.limiter = limiter
+        self.session = requests.Session()
+        # pool_block keeps the number of open connections to this host bounded
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, path, params=None):
+        """GET base_url + path. Retries connection errors, timeouts and 502/503/504 with jittered backoff.
+
+        Every exception counts as a failure for the circuit breaker; only connection errors and
+        timeouts are retried.
+
+        Raises CircuitOpenError without touching the network while the circuit is open, and
+        admission.UpstreamBusy if the limiter sheds the call.
+        """
+        if self.limiter is None:
+            return self._get(path, params)
+        with self.limiter.slot():
+            return self._get(path, params)
+
+    def _get(self, path, params):
+        url = self.base_url + path
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._observe("circuit_open", 0.0)
+                raise CircuitOpenError(f"{self.name} upstream unavailable (circuit open)")
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._observe("error", time.perf_counter() - start)
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    raise
+                logging.warning("%s request failed, retrying: %s", self.name, e)
+            except Exception:
+                # Not retried, but still a failure, so a half-open trial call always settles the breaker
+                self._observe("error", time.perf_counter() - start)
+                self.breaker.record_failure()
+                raise
+            else:
+                self._observe(str(response.status_code), time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    return response
+                logging.warning("%s returned %s, retrying", self.name, response.status_code)
+            attempt += 1
+            time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))  # Full jitter
+
+    def _observe(self, status, seconds):
+        if self.observer is not None:
+            self.observer(self.name, status, seconds)
+
+    def close(self):
+        self.session.close()